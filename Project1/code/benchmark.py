@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import json
+import argparse
+from custom.traverse import ALGORITHMS
+from custom.heuristic import HEURISTICS
+from custom.benchmark import make_suite, run_suite, profile_suite, metadata, compare, DEFAULT_DEPTHS
+
+def parse_args():
+    """Parse command line args
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the puzzle solver on a fixed set of start nodes.")
+    parser.add_argument("-n", "--number", type=int, default=9, help="Size of puzzle to solve.")
+    parser.add_argument("-a", "--algorithm", default="bfs", choices=list(ALGORITHMS.keys()), help="Search algorithm to use.")
+    parser.add_argument("-H", "--heuristic", default="linear", choices=list(HEURISTICS.keys()) + ["pdb", "table"], help="Heuristic used by informed searches.")
+    parser.add_argument("-p", "--pdb", type=str, default="pdb", help="Pattern database or distance table directory (see build_pdb.py).")
+    parser.add_argument("-d", "--depths", nargs="+", type=int, default=DEFAULT_DEPTHS, help="Scramble depths (random moves from the goal).")
+    parser.add_argument("-c", "--count", type=int, default=3, help="Number of start nodes per depth.")
+    parser.add_argument("-S", "--seed", type=int, default=0, help="Random seed for the start nodes.")
+    parser.add_argument("-o", "--output", type=str, default="benchmark.json", help="Output (JSON) results file.")
+    parser.add_argument("-b", "--baseline", type=str, required=False, help="Previous results file to compare against.")
+    parser.add_argument("-P", "--profile", type=str, required=False, help="Profile the suite instead, dumping cProfile stats to this file.")
+
+    args = parser.parse_args()
+    if args.algorithm == "table":
+        args.heuristic = "table"
+    return args
+
+if __name__ == "__main__":
+    # parse arguments
+    args = parse_args()
+
+    # generate our fixed set of start nodes
+    goal = [*range(1,args.number)] + [0]
+    cases = make_suite(goal, args.depths, args.count, args.seed)
+    print("Benchmarking '{}' on {} start nodes...".format(args.algorithm, len(cases)))
+
+    if args.profile:
+        # profile the hot functions
+        print(profile_suite(cases, goal, args.algorithm, args.heuristic, args.pdb, args.profile))
+        print("Profile saved to '{}'".format(args.profile))
+    else:
+        # run each case in isolation and save the results
+        results = list(run_suite(cases, goal, args.algorithm, args.heuristic, args.pdb, verbose=True))
+        settings = metadata(number=args.number, algorithm=args.algorithm, heuristic=args.heuristic,
+                            depths=list(args.depths), count=args.count, seed=args.seed)
+        with open(args.output, "w") as jsonfile:
+            json.dump({"metadata": settings, "results": results}, jsonfile, indent=2)
+        print("Results saved to '{}'".format(args.output))
+
+        # compare against a previous run
+        if args.baseline:
+            with open(args.baseline) as jsonfile:
+                baseline = json.load(jsonfile)["results"]
+            for row in compare(results, baseline):
+                print("Depth {depth}: {time_ratio:.2f}x time, {expanded_ratio:.2f}x nodes expanded vs baseline.".format(**row))
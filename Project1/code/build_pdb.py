@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import time
+import argparse
+from custom.node import make_node
+from custom.pdb import PatternDatabase, DEFAULT_PATTERNS, LARGE_PATTERNS
+from custom.table import DistanceTable
+
+def parse_args():
+    """Parse command line args
+    """
+    parser = argparse.ArgumentParser(description="Build additive pattern databases for use by solve.py.")
+    parser.add_argument("-n", "--number", type=int, default=16, help="Size of puzzle to build for.")
+    parser.add_argument("-o", "--output", type=str, default="pdb", help="Output directory.")
+    parser.add_argument("-t", "--table", action="store_true", help="Build an exact distance table of every state instead.")
+    parser.add_argument("-p", "--patterns", nargs="+", type=str, required=False,
+                        help="Disjoint tile patterns, as comma separated lists (e.g. 1,2,3 4,5,6).")
+    parser.add_argument("-l", "--large", action="store_true", help="Build the larger (stronger, but far slower to build) default patterns.")
+
+    # parse args
+    args = parser.parse_args()
+
+    if args.table:
+        args.patterns = None
+    elif args.patterns:
+        args.patterns = [[int(tile) for tile in pattern.split(",")] for pattern in args.patterns]
+    else:
+        defaults = LARGE_PATTERNS if args.large else DEFAULT_PATTERNS
+        if args.number not in defaults:
+            raise RuntimeError("No default patterns for a puzzle of size {}; please provide --patterns.".format(args.number))
+        args.patterns = defaults[args.number]
+
+    return args
+
+if __name__ == "__main__":
+    # parse arguments
+    args = parse_args()
+
+    # define our goal node (must match that of solve.py)
+    goal = [*range(1,args.number)] + [0]
+    goal_node = make_node(goal)
+    print("Goal node: {}".format(goal_node))
+
+    # build and save our databases
+    st = time.time()
+    database = DistanceTable if args.table else PatternDatabase
+    pdb = database.build(goal_node, args.patterns, verbose=True)
+    print("Pattern databases built in {:.3f} seconds".format(time.time()-st))
+    pdb.save(args.output)
+    print("Saved to '{}'".format(args.output))
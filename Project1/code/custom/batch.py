@@ -0,0 +1,61 @@
+"""Solve many puzzles in parallel, across a pool of processes.
+"""
+import io
+import time
+import contextlib
+from multiprocessing import Pool
+from .node import Tree, make_node
+from .traverse import search, INFORMED
+from .heuristic import get_heuristic
+
+# per-process solver settings (see `_initialize`)
+_settings = {}
+
+def _initialize(goal, algorithm, heuristic, pdb):
+    """Set up a worker process; the goal and heuristic are built only once.
+    """
+    goal_node = make_node(goal)
+    _settings["goal_node"] = goal_node
+    _settings["algorithm"] = algorithm
+    _settings["heuristic"] = get_heuristic(heuristic, goal_node, pdb) if algorithm in INFORMED else None
+
+def _solve(state):
+    """Solve a single start state, returning a dict of results.
+    """
+    start_node = make_node(state)
+    result = {
+        "start": " ".join([str(v) for v in state]),
+        "solveable": start_node.solveable(),
+        "solution_length": None,
+        "expanded": 0,
+        "time": 0.0,
+    }
+    if not result["solveable"]:
+        return result
+
+    # solve (quietly)
+    st = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tree = search(start_node, Tree(_settings["goal_node"]), _settings["algorithm"], _settings["heuristic"])
+    result["time"] = time.time() - st
+    result["expanded"] = tree.expanded
+    if tree.solved():
+        result["solution_length"] = tree.optimal_path_length
+    return result
+
+def solve_batch(states, goal, algorithm="bfs", heuristic="linear", pdb="pdb", jobs=None):
+    """Solve each of the given start states in parallel.
+
+    Args:
+        states: An iterable of flat (row-major) start states.
+        goal: The flat goal state.
+        algorithm: Search algorithm (see `custom.traverse.ALGORITHMS`).
+        heuristic: Heuristic used by informed searches (see `custom.heuristic.get_heuristic`).
+        pdb: Pattern database directory.
+        jobs: Number of processes (defaults to the number of CPUs).
+
+    Yields:
+        A dict of results per start state, in order.
+    """
+    with Pool(jobs, initializer=_initialize, initargs=(goal, algorithm, heuristic, pdb)) as pool:
+        yield from pool.imap(_solve, [[int(v) for v in state] for state in states])
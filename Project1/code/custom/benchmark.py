@@ -0,0 +1,167 @@
+"""Benchmarking and profiling of the search algorithms.
+
+A benchmark suite is a fixed (seeded) set of start nodes, generated by
+scrambling the goal with a number of random moves ("depths"). Each case
+is solved in a fresh process, so that the peak resident memory reported
+for it isn't polluted by earlier cases.
+"""
+import io
+import sys
+import time
+import pstats
+import cProfile
+import resource
+import platform
+import contextlib
+from multiprocessing import Pool
+import numpy as np
+from .node import Tree, Node, make_node
+from .traverse import get_children, search, INFORMED
+from .heuristic import get_heuristic
+
+# default scramble depths (number of random moves from the goal)
+DEFAULT_DEPTHS = (5, 10, 15, 20, 25, 30)
+
+# functions reported when profiling
+HOT_FUNCTIONS = r"get_children|add|__hash__|__init__|delta|__call__|search"
+
+def make_suite(goal, depths=DEFAULT_DEPTHS, count=3, seed=0):
+    """Generate a fixed set of start nodes, `count` per scramble depth.
+
+    Each start node is made via a (seeded) random walk from the goal which
+    never immediately undoes its previous move; the optimal solution can
+    therefore be shorter than the scramble depth.
+
+    Returns:
+        A list of {"depth": int, "start": list} cases.
+    """
+    rng = np.random.default_rng(seed)
+    goal_node = make_node(goal)
+    cases = []
+    for depth in depths:
+        for _ in range(count):
+            node = goal_node
+            previous = None
+            for _ in range(depth):
+                children = [c for c in get_children(node) if c[0] != previous]
+                previous = node.state
+                child, blank = children[rng.integers(len(children))]
+                node = Node(child, node.size, blank)
+            cases.append({"depth": depth, "start": node.tiles()})
+    return cases
+
+def peak_memory():
+    """Return the peak resident memory of this process, in KB.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return usage // 1024 if sys.platform == "darwin" else usage
+
+def run_case(case, goal, algorithm="bfs", heuristic=None):
+    """Solve a single benchmark case, returning a dict of results.
+
+    Args:
+        heuristic: A heuristic object (for informed searches).
+    """
+    start_node = make_node(case["start"])
+    tree = Tree(make_node(goal))
+
+    st = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tree = search(start_node, tree, algorithm, heuristic)
+    elapsed = time.time() - st
+
+    return {
+        "depth": case["depth"],
+        "start": " ".join([str(v) for v in case["start"]]),
+        "solution_length": tree.optimal_path_length if tree.solved() else None,
+        "expanded": tree.expanded,
+        "stored": len(tree),
+        "time": elapsed,
+        "nodes_per_second": tree.expanded / elapsed if elapsed else None,
+        "peak_rss_kb": peak_memory(),
+        "layers": tree.layers,
+    }
+
+def _run_isolated(job):
+    """Pool worker; build the heuristic and run a single case.
+    """
+    case, goal, algorithm, heuristic, pdb = job
+    if algorithm in INFORMED:
+        heuristic = get_heuristic(heuristic, make_node(goal), pdb)
+    else:
+        heuristic = None
+    return run_case(case, goal, algorithm, heuristic)
+
+def run_suite(cases, goal, algorithm="bfs", heuristic="linear", pdb="pdb", verbose=False):
+    """Run every case of the suite, each in a fresh process.
+
+    Yields:
+        A dict of results per case, in order.
+    """
+    jobs = [(case, goal, algorithm, heuristic, pdb) for case in cases]
+    with Pool(1, maxtasksperchild=1) as pool:
+        for result in pool.imap(_run_isolated, jobs):
+            if verbose:
+                msg = "Depth {depth}: {expanded} nodes expanded in {time:.3f} seconds (solution length {solution_length})."
+                print(msg.format(**result))
+            yield result
+
+def profile_suite(cases, goal, algorithm="bfs", heuristic="linear", pdb="pdb", filename=None, top=15):
+    """Run every case of the suite (in this process) under cProfile.
+
+    Args:
+        filename: (Optional) file to dump the raw profile to (see `pstats`).
+        top: Number of hot functions to report.
+
+    Returns:
+        The formatted profile of the hot functions.
+    """
+    heuristic = get_heuristic(heuristic, make_node(goal), pdb) if algorithm in INFORMED else None
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for case in cases:
+        run_case(case, goal, algorithm, heuristic)
+    profiler.disable()
+
+    if filename:
+        profiler.dump_stats(filename)
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report).sort_stats("tottime")
+    stats.print_stats(HOT_FUNCTIONS, top)
+    return report.getvalue()
+
+def metadata(**kwargs):
+    """Return information about the benchmark environment (plus the given settings).
+    """
+    result = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    result.update(kwargs)
+    return result
+
+def compare(results, baseline):
+    """Compare the totals of two sets of results, per depth.
+
+    Returns:
+        A list of {"depth", "time_ratio", "expanded_ratio"} dicts (current / baseline).
+    """
+    def totals(rows):
+        summary = {}
+        for row in rows:
+            time_, expanded = summary.get(row["depth"], (0.0, 0))
+            summary[row["depth"]] = (time_ + row["time"], expanded + row["expanded"])
+        return summary
+
+    current, previous = totals(results), totals(baseline)
+    comparison = []
+    for depth in sorted(set(current) & set(previous)):
+        comparison.append({
+            "depth": depth,
+            "time_ratio": current[depth][0] / previous[depth][0] if previous[depth][0] else None,
+            "expanded_ratio": current[depth][1] / previous[depth][1] if previous[depth][1] else None,
+        })
+    return comparison
@@ -0,0 +1,143 @@
+"""Admissible heuristics used in informed (A* / IDA*) search.
+
+All heuristics operate directly on packed integer states (see
+`custom.node.pack`) and assume the default action model
+(`action_dist=1`), i.e. each move slides a single tile one space.
+"""
+from bisect import bisect_left
+from .node import tile_bits
+from .pdb import PatternDatabase
+from .table import DistanceTable
+
+class Manhattan:
+    """Sum of the Manhattan distances of each tile to its goal position.
+    """
+    def __init__(self, goal_node):
+        self.size = goal_node.size
+        self.bits = tile_bits(self.size)
+        self.mask = (1 << self.bits) - 1
+
+        # dist[tile][position]: distance of the given tile from its goal
+        #  the blank (zero) tile is ignored, and always has distance 0.
+        num_tiles = self.size*self.size
+        self.dist = [[0]*num_tiles for _ in range(num_tiles)]
+        for goal_pos, tile in enumerate(goal_node.tiles()):
+            if tile == 0:
+                continue
+            goal_row, goal_col = divmod(goal_pos, self.size)
+            for pos in range(num_tiles):
+                row, col = divmod(pos, self.size)
+                self.dist[tile][pos] = abs(row-goal_row) + abs(col-goal_col)
+
+    def __call__(self, state):
+        """Return the estimated cost-to-go of the given packed state.
+        """
+        bits, mask, dist = self.bits, self.mask, self.dist
+        return sum([dist[(state >> (pos*bits)) & mask][pos] for pos in range(self.size*self.size)])
+
+    def delta(self, state, child, blank, target):
+        """Return the change in estimate when moving from `state` to `child`,
+        i.e. when the tile at position `target` slides into the `blank`.
+        """
+        tile = (state >> (target*self.bits)) & self.mask
+        return self.dist[tile][blank] - self.dist[tile][target]
+
+class LinearConflict(Manhattan):
+    """Manhattan distance plus linear conflicts.
+
+    Two tiles in their goal row (or column) but in the wrong relative
+    order must pass each other, which costs at least two extra moves. For
+    each line we add 2 moves for every tile that has to leave the line, i.e.
+    2*(number of tiles in their goal line - longest correctly ordered subset).
+    """
+    def __init__(self, goal_node):
+        super().__init__(goal_node)
+
+        # lines: rows [0,size) followed by columns [size,2*size). Each line
+        #  stores its positions and a lookup of (tile: goal index within the line)
+        #  for the tiles whose goal lies in that line (-1 otherwise).
+        num_tiles = self.size*self.size
+        goal = goal_node.tiles()
+        self.lines = []
+        for row in range(self.size):
+            positions = [row*self.size + col for col in range(self.size)]
+            keys = [-1]*num_tiles
+            for col,pos in enumerate(positions):
+                if goal[pos]:
+                    keys[goal[pos]] = col
+            self.lines.append((positions, keys))
+        for col in range(self.size):
+            positions = [row*self.size + col for row in range(self.size)]
+            keys = [-1]*num_tiles
+            for row,pos in enumerate(positions):
+                if goal[pos]:
+                    keys[goal[pos]] = row
+            self.lines.append((positions, keys))
+
+    def conflicts(self, state, line):
+        """Return the linear conflict penalty of a single line.
+        """
+        bits, mask = self.bits, self.mask
+        positions, keys = self.lines[line]
+
+        # goal indices of all tiles in this line that belong to it
+        order = []
+        for pos in positions:
+            key = keys[(state >> (pos*bits)) & mask]
+            if key >= 0:
+                order.append(key)
+        if len(order) < 2:
+            return 0
+
+        # length of the longest increasing subsequence
+        tails = []
+        for key in order:
+            idx = bisect_left(tails, key)
+            if idx == len(tails):
+                tails.append(key)
+            else:
+                tails[idx] = key
+        return 2*(len(order) - len(tails))
+
+    def __call__(self, state):
+        """Return the estimated cost-to-go of the given packed state.
+        """
+        return super().__call__(state) + sum([self.conflicts(state, line) for line in range(len(self.lines))])
+
+    def delta(self, state, child, blank, target):
+        """Return the change in estimate when moving from `state` to `child`.
+
+        Only the two lines crossed by the moving tile can change.
+        """
+        result = super().delta(state, child, blank, target)
+        if blank // self.size == target // self.size:
+            # horizontal move; the tile changes columns
+            lines = (self.size + blank % self.size, self.size + target % self.size)
+        else:
+            # vertical move; the tile changes rows
+            lines = (blank // self.size, target // self.size)
+        for line in lines:
+            result += self.conflicts(child, line) - self.conflicts(state, line)
+        return result
+
+# available heuristics, by name
+HEURISTICS = {
+    "manhattan": Manhattan,
+    "linear": LinearConflict,
+}
+
+def get_heuristic(name, goal_node, pdb="pdb"):
+    """Return the named heuristic for the given goal.
+
+    Args:
+        name: One of `HEURISTICS`, "pdb" for pattern databases or
+            "table" for an exact distance table.
+        pdb: Pattern database (or distance table) directory (see `custom.pdb`).
+    """
+    if name == "pdb":
+        return PatternDatabase.load(pdb, goal_node)
+    if name == "table":
+        return DistanceTable.load(pdb, goal_node)
+    if name not in HEURISTICS:
+        raise RuntimeError("Unknown heuristic '{}'.".format(name))
+    return HEURISTICS[name](goal_node)
@@ -1,5 +1,95 @@
 import numpy as np
 
+def tile_bits(size):
+    """Number of bits used to store a single tile of a (size x size) puzzle.
+
+    8 and 15 puzzles fit into 4 bits per tile, 24 puzzles need 5, etc.
+    """
+    return max(1, (size*size-1).bit_length())
+
+def pack(tiles, size):
+    """Pack a flat (row-major) list of tiles into a single integer.
+
+    Tile `i` occupies bits [i*b, (i+1)*b), where b = tile_bits(size).
+    """
+    bits = tile_bits(size)
+    state = 0
+    for i, tile in enumerate(tiles):
+        state |= int(tile) << (i*bits)
+    return state
+
+def unpack(state, size):
+    """Unpack the given integer state into a flat (row-major) list of tiles.
+    """
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    return [(state >> (i*bits)) & mask for i in range(size*size)]
+
+def solveable(states):
+    """Vectorized check of which of the given boards are solveable.
+
+    A board can reach the goal (1, 2, ..., N-1, 0) iff the parity of the
+    permutation between it and the goal matches the parity of the
+    Manhattan distance of the blank from its goal position. This holds for
+    both odd and even board widths. The permutation parity is found by
+    sorting each board with explicit swaps, one position at a time.
+
+    Args:
+        states: An (N, size*size) array of flat (row-major) boards.
+
+    Returns:
+        An (N,) boolean array.
+    """
+    states = np.atleast_2d(states)
+    count, num_tiles = states.shape
+    size = int(np.sqrt(num_tiles))
+
+    # goal position of each tile (the blank goes last)
+    perm = (states.astype(np.int64) - 1) % num_tiles
+    inv = np.argsort(perm, axis=1)
+    rows = np.arange(count)
+
+    # count the swaps needed to sort each permutation
+    parity = np.zeros(count, dtype=bool)
+    for i in range(num_tiles):
+        j = inv[:,i]
+        parity ^= j != i
+        value = perm[:,i].copy()
+        perm[rows,j] = value
+        perm[:,i] = i
+        inv[rows,value] = j
+        inv[:,i] = i
+
+    # distance of the blank from its goal (bottom right) position
+    blank = np.argmax(states == 0, axis=1)
+    distance = 2*(size-1) - blank // size - blank % size
+
+    return parity == (distance % 2 == 1)
+
+def random_states(number, count=1, seed=None):
+    """Generate random solveable boards (uniformly).
+
+    Unsolveable permutations are fixed by swapping their first two
+    non-blank tiles, which flips the permutation parity.
+
+    Args:
+        number: Number of tiles (including the blank), e.g. 9.
+        count: Number of boards to generate.
+        seed: (Optional) seed or np.random.Generator.
+
+    Returns:
+        A (count, number) np.uint8 array of flat (row-major) boards.
+    """
+    rng = np.random.default_rng(seed)
+    states = rng.permuted(np.tile(np.arange(number, dtype=np.uint8), (count,1)), axis=1)
+
+    # swap the first two non-blank tiles of each unsolveable board
+    bad = np.nonzero(~solveable(states))[0]
+    first = np.where(states[bad,0] == 0, 1, 0)
+    second = np.where(states[bad,:2].all(axis=1), 1, 2)
+    states[bad,first], states[bad,second] = states[bad,second], states[bad,first]
+    return states
+
 def make_node(state, parent=None):
     """Perform some sanity checks on state information.
     This is for parsing input lists, not internal operation.
@@ -11,26 +101,28 @@ def make_node(state, parent=None):
     Returns:
         A custom.Node object containing state info.
     """
-    
+
     # get shape information
+    state = [int(v) for v in state]
     shape = int(np.sqrt(len(state)))
 
     # sanity checks:
     if not shape*shape == len(state):
         raise RuntimeError("Square root of the length of input list must be an integer!.")
+    if not sorted(state) == list(range(len(state))):
+        raise RuntimeError("Expected input list to be a permutation of 0..{}.".format(len(state)-1))
     if not isinstance(parent,(Node, type(None))):
         raise RuntimeError("Expected parent to be of type 'custom.Node'")
 
     # if we've passed all our sanity checks, return a node:
-    state = np.array(state, dtype=np.uint8)
-    state.resize([shape]*2)
-    return Node(np.array(state,dtype=np.uint8), parent)
+    return Node(pack(state, shape), shape, state.index(0), parent)
 
 class Tree:
     """A tree (basically just a dict of Nodes)
     """
     def __init__(self, goal_node):
-        # nodes: flat dict of (hash: object) for Nodes.
+        # nodes: flat dict of (state: object) for Nodes.
+        #  packed states are unique integers, so they make collision-free keys
         self.nodes = {}
 
         # also keep a list of "correct" nodes (not hashes!!)
@@ -38,31 +130,37 @@ class Tree:
         self.optimal_path_length = np.inf
         self.optimal_node = None
 
+        # number of nodes expanded by the search
+        self.expanded = 0
+
+        # per-layer search statistics (for layered searches)
+        self.layers = []
+
         # keep track of our target node
         self.goal_node = goal_node
-        self.goal_hash = hash(goal_node)
+        self.goal_hash = goal_node.state
 
     def solved(self):
         return len(self.successes) > 0
 
     def backtrack(self, node):
-        """Walk back up the given tree, returning the sequential set 
+        """Walk back up the given tree, returning the sequential set
         of parent nodes.
         """
-        sequence = [hash(node)]
+        sequence = [node.state]
         child = node
         while child.parent is not None:
-            sequence.append(hash(child.parent))
+            sequence.append(child.parent.state)
             child = child.parent
-    
+
         # we actually want the reverse of this sequence
         sequence.reverse()
         return sequence
 
-    def check_optimal(self):
-        """Check which of our successes is the optimal path.
+    def check_optimal(self, nodes=None):
+        """Check which of our successes (or the given subset of them) is the optimal path.
         """
-        for node in self.successes:
+        for node in (self.successes if nodes is None else nodes):
             path_length = len(self.backtrack(node))
             if path_length < self.optimal_path_length:
                 self.optimal_node = node
@@ -80,87 +178,107 @@ class Tree:
         Returns:
             bool indicating if the traversal should continue
         """
-        node_hash = hash(node)
-        
+        node_hash = node.state
+
         # check if this is a successful node.
         if self.success(node_hash):
             print("Success found!")
             self.successes.append(node)
-            if node_hash not in self.nodes.keys():
+            if node_hash not in self.nodes:
                 self.nodes[node_hash] = node
-            self.check_optimal()
+            self.check_optimal([node])
             return False
-        
+
         # check if node already exists; if so ignore
-        if node_hash in self.nodes.keys():
+        if node_hash in self.nodes:
             return False
 
         # add to dict
         self.nodes[node_hash] = node
         return True
-    
+
     def __len__(self):
         # define length as the length of nodes
         return len(self.nodes)
 
     #-------------------- PRINTING API ------------------------#
 
-    def print_soln(self):
-        """ String representation of the solution.
+    def iter_soln(self):
+        """Lines of the solution (one node per line).
         """
-        result = ""
         if self.solved():
             for node_hash in self.backtrack(self.optimal_node):
-                result += str(self.nodes[node_hash]) + "\n"
-        return result
-    
+                yield str(self.nodes[node_hash]) + "\n"
+
+    def iter_all(self):
+        """Lines of all explored nodes (one node per line).
+        """
+        for node in self.nodes.values():
+            yield str(node) + "\n"
+
+    def iter_info(self):
+        """Lines of the parent/child relationship of nodes.
+        """
+        for node in self.nodes.values():
+            parent_idx = 0 if not node.parent else node.parent.index
+            yield "{} {} 0\n".format(node.index, parent_idx)
+
+    def print_soln(self):
+        """ String representation of the solution.
+        """
+        return "".join(self.iter_soln())
+
     def print_all(self):
         """ String representation of all explored nodes..
         """
-        result = ""
-        for _,node in self.nodes.items():
-            result += str(node) + "\n"
-        return result
+        return "".join(self.iter_all())
 
     def print_info(self):
         """String representation of parent/child relationship of nodes.
-        This is really slow....
         """
-        result = ""
-        for _,node in self.nodes.items():
-            parent_idx = 0 if not node.parent else node.parent.index
-            result += "{} {} 0\n".format(node.index, parent_idx)
-        return result
+        return "".join(self.iter_info())
 
 class Node:
     """A simple data structure to handle node information.
 
+    The board is stored as a single packed integer (see `pack`), along
+    with the board width and the flat index of the blank tile.
+
     No error checking is done in this class.
     """
-    def __init__(self, state, parent=None, index=0):
-        # assume state is square np array
+    __slots__ = ("state", "size", "blank", "parent", "index")
+
+    def __init__(self, state, size, blank, parent=None, index=0):
+        # packed integer representation of the board
         self.state = state
+        # board width (i.e. 3 for the 8-puzzle)
+        self.size = size
+        # flat (row-major) index of the blank tile
+        self.blank = blank
         # assume parent is a reference to another node
         self.parent = parent
         # index (order in which this was found)
         self.index = index
 
+    def tiles(self):
+        """Return the flat (row-major) list of tiles.
+        """
+        return unpack(self.state, self.size)
+
+    def to_array(self):
+        """Return the board as a square np.uint8 array.
+        """
+        return np.array(self.tiles(), dtype=np.uint8).reshape([self.size]*2)
+
     def solveable(self):
-        """Returns true if this node is solveable
-        https://math.stackexchange.com/questions/293527/how-to-check-if-a-8-puzzle-is-solvable
+        """Returns true if this node is solveable (see `solveable`).
         """
-        state = self.state.flatten().tolist()
-        size = len(state)
-        inv_count = 0 
-        for i in range(size):
-            for j in range(i+1,size): 
-                if (state[j] and state[i] and state[i] > state[j]):
-                  inv_count += 1
-        return inv_count%2 == 0
-    
+        return bool(solveable(self.tiles())[0])
+
     def __hash__(self):
-        return hash(tuple(self.state.flatten()))
+        return hash(self.state)
 
     def __str__(self):
-        return " ".join([str(v) for v in self.state.flatten('F')])
-
+        # column-major, to match the expected output format
+        tiles = self.tiles()
+        return " ".join([str(tiles[r*self.size+c]) for c in range(self.size) for r in range(self.size)])
@@ -0,0 +1,289 @@
+"""Additive pattern databases (PDBs) for use as a search heuristic.
+
+A pattern is a subset of the tiles. The database for a pattern stores,
+for every placement of those tiles, the minimum number of moves *of
+pattern tiles* required to bring them to their goal positions (all other
+tiles are indistinguishable). Since each move only moves a single tile,
+the values of disjoint patterns can be summed into an admissible heuristic.
+
+Tables are built once via a backward breadth first search from the goal
+(see `build_table`), saved as `.npy` byte arrays and memory mapped when
+loaded.
+
+https://en.wikipedia.org/wiki/Pattern_database
+"""
+import os
+import json
+import time
+import numpy as np
+from .node import tile_bits
+
+# default (disjoint) tile partitions, by number of tiles,
+#  for the default goal of (1, 2, ..., N-1, 0); each builds in about a minute
+DEFAULT_PATTERNS = {
+    9: [(1,2,3,4), (5,6,7,8)],
+    16: [(1,5,6,9,13), (2,3,4,7,8), (10,11,12,14,15)],
+    25: [(1,2,6,7), (3,4,8,9), (5,10,15,20), (11,12,16,17), (13,14,18,19), (21,22,23,24)],
+}
+
+# larger partitions; stronger heuristics, but far slower (and larger) to build
+LARGE_PATTERNS = {
+    16: [(1,5,6,9,10,13), (7,8,11,12,14,15), (2,3,4)],
+    25: [(1,2,6,7,11,12), (3,4,5,8,9,10), (13,14,15,18,19,20), (16,17,21,22,23,24)],
+}
+
+# number of states to expand at once during construction
+CHUNK_SIZE = 1 << 20
+
+# marker for unvisited states
+UNVISITED = 255
+
+def count(num_cells, length):
+    """Number of ordered placements of `length` items in `num_cells` cells.
+    """
+    return int(np.prod(np.arange(num_cells-length+1, num_cells+1, dtype=np.int64)))
+
+def multipliers(num_cells, length):
+    """Return the mixed-radix multipliers used by `rank`/`unrank`.
+    """
+    return [count(num_cells-i-1, length-i-1) for i in range(length)]
+
+def rank(positions, num_cells):
+    """Return the (perfect hash) index of each row of placements.
+
+    Args:
+        positions: An (N, length) array of distinct cell indices.
+        num_cells: The total number of cells.
+
+    Returns:
+        An (N,) int64 array of indices in [0, count(num_cells, length)).
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    length = positions.shape[1]
+    result = np.zeros(positions.shape[0], dtype=np.int64)
+    for i, mult in enumerate(multipliers(num_cells, length)):
+        # index of this position among the cells not already used
+        compact = positions[:,i].copy()
+        for j in range(i):
+            compact -= positions[:,j] < positions[:,i]
+        result += compact*mult
+    return result
+
+def unrank(indices, num_cells, length):
+    """Inverse of `rank`.
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    positions = np.empty((indices.size, length), dtype=np.int64)
+    for i, mult in enumerate(multipliers(num_cells, length)):
+        # convert the compact index back into a cell index, skipping
+        #  over (in ascending order) the cells already used
+        pos = (indices // mult) % (num_cells - i)
+        used = np.sort(positions[:,:i], axis=1)
+        for j in range(i):
+            pos += pos >= used[:,j]
+        positions[:,i] = pos
+    return positions
+
+def get_neighbours(size):
+    """Return a (size*size, 4) array of neighbouring cells (-1 if out of bounds).
+    """
+    neighbours = np.full((size*size, 4), -1, dtype=np.int64)
+    for cell in range(size*size):
+        row, col = divmod(cell, size)
+        for i, (dr, dc) in enumerate([(-1,0),(1,0),(0,-1),(0,1)]):
+            if 0 <= row+dr < size and 0 <= col+dc < size:
+                neighbours[cell,i] = (row+dr)*size + col+dc
+    return neighbours
+
+def _expand(indices, num_cells, length, neighbours):
+    """Expand the given (abstract) states.
+
+    Each state is a placement of the pattern tiles followed by the blank.
+
+    Returns:
+        (free, moved): indices of children reached by moving the blank
+        into a non-pattern cell (cost 0) and by moving a pattern tile (cost 1).
+    """
+    positions = unrank(indices, num_cells, length)
+    blank = positions[:,-1]
+
+    free, moved = [], []
+    for direction in range(neighbours.shape[1]):
+        target = neighbours[blank, direction]
+        valid = target >= 0
+        children = positions[valid]
+        target = target[valid]
+
+        # find the pattern tile (if any) in the target cell, and swap it
+        #  with the blank
+        occupied = children[:,:-1] == target[:,None]
+        swapped = occupied.any(axis=1)
+        rows, cols = np.nonzero(occupied)
+        children[rows,cols] = children[rows,-1]
+        children[:,-1] = target
+
+        ranks = rank(children, num_cells)
+        free.append(ranks[~swapped])
+        moved.append(ranks[swapped])
+    return np.concatenate(free), np.concatenate(moved)
+
+def _visit(indices, dist, cost):
+    """Mark the unvisited subset of `indices` with the given cost, returning it.
+    """
+    indices = np.unique(indices)
+    indices = indices[dist[indices] == UNVISITED]
+    dist[indices] = cost
+    return indices
+
+def build_table(goal_node, pattern, verbose=False):
+    """Build the database for a single pattern via a backward 0-1 BFS.
+
+    The BFS is run over (pattern tiles + blank) placements, in bulk via
+    numpy. The final table is minimized over all blank positions.
+
+    Args:
+        goal_node: The goal custom.Node.
+        pattern: A sequence of (non-zero) tiles.
+
+    Returns:
+        A uint8 array, indexed by `rank` of the pattern tile positions.
+    """
+    size = goal_node.size
+    num_cells = size*size
+    length = len(pattern) + 1
+    neighbours = get_neighbours(size)
+
+    # initial state; the goal
+    goal = goal_node.tiles()
+    start = [goal.index(tile) for tile in pattern] + [goal.index(0)]
+    dist = np.full(count(num_cells, length), UNVISITED, dtype=np.uint8)
+    layer = _visit(rank([start], num_cells), dist, 0)
+
+    cost = 0
+    while layer.size:
+        st = time.time()
+
+        # explore everything reachable at the current cost, collecting
+        #  candidates for the next layer along the way
+        frontier = layer
+        candidates = []
+        while frontier.size:
+            new = []
+            for i in range(0, frontier.size, CHUNK_SIZE):
+                free, moved = _expand(frontier[i:i+CHUNK_SIZE], num_cells, length, neighbours)
+                new.append(_visit(free, dist, cost))
+                moved = np.unique(moved)
+                candidates.append(moved[dist[moved] == UNVISITED])
+            frontier = np.concatenate(new)
+
+        # next layer (anything not already reached at the current cost)
+        layer = _visit(np.concatenate(candidates), dist, cost+1)
+        if verbose:
+            msg = "Pattern {}: cost {} done in {:.3f} seconds, {} states found at cost {}."
+            print(msg.format(pattern, cost, time.time()-st, layer.size, cost+1))
+        cost += 1
+
+    # the blank is always the last (i.e. least significant) placement;
+    #  take the best value over all blank positions
+    return dist.reshape(-1, num_cells-length+1).min(axis=1)
+
+class PatternDatabase:
+    """An additive set of disjoint pattern databases.
+
+    Follows the same API as the heuristics in `custom.heuristic`.
+    """
+    def __init__(self, goal_node, patterns, tables):
+        # sanity checks
+        tiles = [tile for pattern in patterns for tile in pattern]
+        if len(tiles) != len(set(tiles)) or 0 in tiles:
+            raise RuntimeError("Patterns must be disjoint and cannot contain the blank (0) tile.")
+        if len(patterns) != len(tables):
+            raise RuntimeError("Expected one table per pattern.")
+
+        self.goal = goal_node.tiles()
+        self.size = goal_node.size
+        self.bits = tile_bits(self.size)
+        self.mask = (1 << self.bits) - 1
+        self.patterns = [tuple(pattern) for pattern in patterns]
+        self.tables = tables
+
+        # lookup of (tile: pattern index), and rank multipliers per pattern
+        num_cells = self.size*self.size
+        self.pattern_of = [None]*num_cells
+        for i,pattern in enumerate(self.patterns):
+            for tile in pattern:
+                self.pattern_of[tile] = i
+        self.multipliers = [multipliers(num_cells, len(pattern)) for pattern in self.patterns]
+
+    @classmethod
+    def build(cls, goal_node, patterns=None, verbose=False):
+        """Build all the tables for the given patterns (or the defaults).
+        """
+        if patterns is None:
+            patterns = DEFAULT_PATTERNS[goal_node.size**2]
+        tables = [build_table(goal_node, pattern, verbose) for pattern in patterns]
+        return cls(goal_node, patterns, tables)
+
+    @classmethod
+    def load(cls, directory, goal_node):
+        """Load (memory map) a previously saved set of tables.
+        """
+        with open(os.path.join(directory, "manifest.json")) as jsonfile:
+            manifest = json.load(jsonfile)
+        if manifest["goal"] != goal_node.tiles():
+            raise RuntimeError("Pattern database in '{}' was built for a different goal.".format(directory))
+
+        tables = [np.load(os.path.join(directory, filename), mmap_mode="r") for filename in manifest["tables"]]
+        return cls(goal_node, manifest["patterns"], tables)
+
+    def save(self, directory):
+        """Save our tables (and the information needed to load them).
+        """
+        os.makedirs(directory, exist_ok=True)
+        manifest = {"goal": self.goal, "patterns": [list(p) for p in self.patterns], "tables": []}
+        for i,table in enumerate(self.tables):
+            filename = "pattern_{}.npy".format(i)
+            np.save(os.path.join(directory, filename), table)
+            manifest["tables"].append(filename)
+        with open(os.path.join(directory, "manifest.json"), "w") as jsonfile:
+            json.dump(manifest, jsonfile)
+
+    def positions(self, state):
+        """Return the (tile: position) lookup of the given packed state.
+        """
+        bits, mask = self.bits, self.mask
+        result = [0]*(self.size*self.size)
+        for pos in range(self.size*self.size):
+            result[(state >> (pos*bits)) & mask] = pos
+        return result
+
+    def lookup(self, positions, index):
+        """Return the value of a single pattern for the given tile positions.
+        """
+        result = 0
+        used = []
+        for tile, mult in zip(self.patterns[index], self.multipliers[index]):
+            pos = positions[tile]
+            result += (pos - len([u for u in used if u < pos]))*mult
+            used.append(pos)
+        return int(self.tables[index][result])
+
+    def __call__(self, state):
+        """Return the estimated cost-to-go of the given packed state.
+        """
+        positions = self.positions(state)
+        return sum([self.lookup(positions, i) for i in range(len(self.patterns))])
+
+    def delta(self, state, child, blank, target):
+        """Return the change in estimate when moving from `state` to `child`.
+
+        Only the pattern containing the moved tile can change.
+        """
+        tile = (state >> (target*self.bits)) & self.mask
+        index = self.pattern_of[tile]
+        if index is None:
+            return 0
+        positions = self.positions(state)
+        before = self.lookup(positions, index)
+        positions[tile] = blank
+        return self.lookup(positions, index) - before
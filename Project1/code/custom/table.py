@@ -0,0 +1,36 @@
+"""Whole state space (retrograde) distance tables, for small puzzles.
+
+A distance table is simply a pattern database (see `custom.pdb`) whose
+single pattern contains every tile: the backward BFS from the goal then
+visits every reachable state, and the stored value is the exact number
+of moves to the goal. The 8-puzzle needs only 9! bytes.
+
+Any query can then be answered by greedily following decreasing
+distances (see `custom.traverse.descend`).
+"""
+from .pdb import PatternDatabase
+
+# largest puzzle (number of tiles) we allow tables for; 16! bytes is a bit much
+MAX_TILES = 9
+
+class DistanceTable(PatternDatabase):
+    """Exact distance-to-goal of every state (indexed by permutation rank).
+    """
+    def __init__(self, goal_node, patterns, tables):
+        super().__init__(goal_node, patterns, tables)
+
+        # sanity checks
+        if goal_node.size**2 > MAX_TILES:
+            raise RuntimeError("Distance tables are only supported for puzzles of up to {} tiles.".format(MAX_TILES))
+        if len(self.patterns) != 1 or sorted(self.patterns[0]) != list(range(1, goal_node.size**2)):
+            raise RuntimeError("A distance table requires a single pattern containing every tile.")
+
+    @classmethod
+    def build(cls, goal_node, patterns=None, verbose=False):
+        """Build the table via a single backward BFS from the goal.
+        """
+        if goal_node.size**2 > MAX_TILES:
+            raise RuntimeError("Distance tables are only supported for puzzles of up to {} tiles.".format(MAX_TILES))
+        if patterns is None:
+            patterns = [[tile for tile in goal_node.tiles() if tile]]
+        return super().build(goal_node, patterns, verbose)
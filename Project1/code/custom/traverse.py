@@ -1,78 +1,346 @@
 """Classes and scripts used in Tree Traversal.
 """
 import time
-import numpy as np
-from .node import Node
+from heapq import heappush, heappop
+from functools import lru_cache
+from .node import Node, tile_bits
+from .pdb import UNVISITED as table_unreachable
 
 def bfs(start_node, tree, verbose=False):
     """Perform a Brute Force Search, appending data to the 
     given `tree` and starting from the given `node`
 
+    Children are checked against the tree as they are generated (so each
+    state is only ever stored once) and the search stops as soon as the
+    goal is found; in a breadth first search the first hit is optimal.
+
+    Statistics for each layer are appended to `tree.layers` (and printed
+    as each layer completes if `verbose`).
+
     This was initially written to be recursive, by python is
     kinda squeamish about recursion limits.
     """
     # timing info
     st = time.time()
 
-    current_nodes = [start_node]
+    # the start node may already be the goal
+    if not tree.add(start_node):
+        current_nodes = []
+    else:
+        current_nodes = [start_node]
+
     index = 0
+    nodes = tree.nodes
     while current_nodes:
-        if verbose:
-            loop_time = time.time()
+        loop_time = time.time()
 
         new_nodes = []
         for node in current_nodes:
-            # Add the node to the tree
-            if not tree.add(node):
-                continue
+            tree.expanded += 1
 
-            # find the children of the given node:
-            children = get_children(node.state)
-            for child in children:
+            # find the (unseen) children of the given node:
+            for child, blank in get_children(node):
+                if child in nodes:
+                    continue
                 index += 1
-                new_nodes += [Node(child, node, index)]
-        
-        # update our list
-        current_nodes = new_nodes
-        
+                child_node = Node(child, node.size, blank, node, index)
+
+                # stop as soon as we find the goal
+                if child == tree.goal_hash:
+                    tree.add(child_node)
+                    break
+
+                nodes[child] = child_node
+                new_nodes.append(child_node)
+
+            if tree.solved():
+                break
+
+        # record layer statistics
+        tree.layers.append({
+            "depth": len(tree.layers) + 1,
+            "expanded": len(current_nodes),
+            "found": len(new_nodes),
+            "total": len(tree),
+            "time": time.time() - loop_time
+        })
         if verbose:
-            msg = "Processed {} nodes in {:.3f} seconds, {} more found."
-            print(msg.format(len(tree),time.time()-loop_time,len(new_nodes)))
+            msg = "Layer {depth}: expanded {expanded} nodes in {time:.3f} seconds, {found} more found."
+            print(msg.format(**tree.layers[-1]))
+
+        # update our list
+        current_nodes = [] if tree.solved() else new_nodes
 
     print("Tree traversed in {:.3f} seconds".format(time.time()-st))
     
     # this really isn't necessary, but it's for nice function flow
     return tree
 
+def bidirectional_bfs(start_node, tree, action_dist=1, verbose=False):
+    """Perform a bidirectional Brute Force Search, growing one frontier
+    from the given `node` and one from the `tree`'s goal node, one layer
+    at a time (always expanding the smaller frontier).
+
+    The search stops as soon as the two frontiers meet; since every
+    layer is checked against everything seen by the other search, the
+    first meeting point lies on an optimal path. Nodes found from the
+    start are appended to the `tree`, along with the remainder of the
+    optimal path (from the meeting point to the goal).
+
+    Statistics for each layer are appended to `tree.layers`.
+    """
+    # timing info
+    st = time.time()
+
+    # nodes found by the forward search live in the tree; those found by the
+    #  backward search are kept separately (their parents point towards the goal)
+    if not tree.add(start_node):
+        print("Tree traversed in {:.3f} seconds".format(time.time()-st))
+        return tree
+    forward = [start_node]
+    backward = [tree.goal_node]
+    backward_nodes = {tree.goal_hash: tree.goal_node}
+
+    index = 0
+    meet = None
+    while forward and backward and meet is None:
+        loop_time = time.time()
+
+        # expand the smaller of the two frontiers
+        is_forward = len(forward) <= len(backward)
+        if is_forward:
+            frontier, seen, other = forward, tree.nodes, backward_nodes
+        else:
+            frontier, seen, other = backward, backward_nodes, tree.nodes
+
+        new_nodes = []
+        for node in frontier:
+            tree.expanded += 1
+            for child, blank in get_children(node, action_dist):
+                if child in seen:
+                    continue
+                index += 1
+                child_node = Node(child, node.size, blank, node, index)
+                seen[child] = child_node
+                new_nodes.append(child_node)
+
+                # check if we've met the other search
+                if child in other:
+                    meet = child
+                    break
+            if meet is not None:
+                break
+
+        if is_forward:
+            forward = new_nodes
+        else:
+            backward = new_nodes
+
+        # record layer statistics
+        tree.layers.append({
+            "depth": len(tree.layers) + 1,
+            "direction": "forward" if is_forward else "backward",
+            "expanded": len(frontier),
+            "found": len(new_nodes),
+            "total": len(tree) + len(backward_nodes),
+            "time": time.time() - loop_time
+        })
+        if verbose:
+            msg = "Layer {depth}: expanded {expanded} {direction} nodes in {time:.3f} seconds, {found} more found."
+            print(msg.format(**tree.layers[-1]))
+
+    if meet is not None:
+        # follow the backward search from the meeting point to the goal,
+        #  appending each node to the forward path
+        node = tree.nodes[meet]
+        other = backward_nodes[meet]
+        while other.parent is not None:
+            other = other.parent
+            index += 1
+            node = Node(other.state, node.size, other.blank, node, index)
+            tree.add(node)
+
+        # the meeting point might have been the goal itself
+        if not tree.solved():
+            tree.add(node)
+
+    print("Tree traversed in {:.3f} seconds".format(time.time()-st))
+    return tree
+
+def astar(start_node, tree, heuristic, verbose=False):
+    """Perform an A* search, appending expanded nodes to the
+    given `tree` and starting from the given `node`.
+
+    Args:
+        heuristic: An admissible (and consistent) heuristic, such
+            as those found in `custom.heuristic`.
+    """
+    # timing info
+    st = time.time()
+
+    # open set, ordered by (cost2come + cost2go); ties go to deeper nodes.
+    #  each entry is (f, -g, index, h, node)
+    h = heuristic(start_node.state)
+    open_set = [(h, 0, 0, h, start_node)]
+    cost2come = {start_node.state: 0}
+    index = 0
+    while open_set:
+        _, g, _, h, node = heappop(open_set)
+
+        # add the node to the tree (skipping already expanded nodes)
+        if not tree.add(node):
+            if tree.solved():
+                break
+            continue
+        tree.expanded += 1
+
+        if verbose and tree.expanded % 100000 == 0:
+            print("Expanded {} nodes, f = {}.".format(tree.expanded, h - g))
+
+        # find the children of the given node:
+        g = 1 - g
+        for child, blank in get_children(node):
+            if g >= cost2come.get(child, g+1):
+                continue
+            cost2come[child] = g
+            child_h = h + heuristic.delta(node.state, child, node.blank, blank)
+            index += 1
+            heappush(open_set, (g + child_h, -g, index, child_h, Node(child, node.size, blank, node, index)))
+
+    print("Tree traversed in {:.3f} seconds".format(time.time()-st))
+    return tree
+
+def idastar(start_node, tree, heuristic, verbose=False):
+    """Perform an Iterative Deepening A* search from the given `node`.
+
+    Memory usage is bounded by the depth of the solution; as such
+    only the nodes along the solution path are added to the `tree`.
+
+    Args:
+        heuristic: An admissible heuristic, such as those found in `custom.heuristic`.
+    """
+    # timing info
+    st = time.time()
+
+    size = start_node.size
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    moves = get_moves(size)
+    goal = tree.goal_hash
+
+    # current search path; (state, blank) pairs
+    path = [(start_node.state, start_node.blank)]
+
+    def search(state, blank, previous, g, h, bound):
+        """Depth first search bounded by `bound`. Returns None if the goal is
+        found, else the smallest f value which exceeded the bound.
+        """
+        f = g + h
+        if f > bound:
+            return f
+        if state == goal:
+            return None
+        tree.expanded += 1
+
+        minimum = float("inf")
+        blank_shift = blank*bits
+        for target in moves[blank]:
+            # don't undo the previous move
+            if target == previous:
+                continue
+            shift = target*bits
+            tile = (state >> shift) & mask
+            child = state - (tile << shift) + (tile << blank_shift)
+
+            path.append((child, target))
+            result = search(child, target, blank, g+1, h + heuristic.delta(state, child, blank, target), bound)
+            if result is None:
+                return None
+            path.pop()
+            minimum = min(minimum, result)
+        return minimum
+
+    # iteratively deepen our f bound until the goal is found
+    h = heuristic(start_node.state)
+    bound = h
+    while True:
+        if verbose:
+            loop_time = time.time()
+        result = search(start_node.state, start_node.blank, None, 0, h, bound)
+        if verbose:
+            msg = "Searched bound {} in {:.3f} seconds, {} nodes expanded."
+            print(msg.format(bound, time.time()-loop_time, tree.expanded))
+        if result is None or result == float("inf"):
+            break
+        bound = result
+
+    # add our solution path to the tree
+    if result is None:
+        parent = None
+        for index, (state, blank) in enumerate(path):
+            parent = Node(state, size, blank, parent, index)
+            tree.add(parent)
+
+    print("Tree traversed in {:.3f} seconds".format(time.time()-st))
+    return tree
+
+def descend(start_node, tree, table, verbose=False):
+    """Follow an exact distance table (see `custom.table`) from the given
+    `node` to the goal, always moving to a child one move closer.
+
+    Only the nodes along the (optimal) path are added to the `tree`.
+    """
+    # timing info
+    st = time.time()
+
+    node = start_node
+    distance = table(node.state)
+    if distance >= table_unreachable:
+        print("Start node is not in the distance table (unsolveable).")
+        return tree
+
+    tree.add(node)
+    index = 0
+    while distance > 0:
+        tree.expanded += 1
+        for child, blank in get_children(node):
+            if table(child) == distance - 1:
+                break
+        index += 1
+        node = Node(child, node.size, blank, node, index)
+        tree.add(node)
+        distance -= 1
+
+    if verbose:
+        print("Descended {} moves.".format(index))
+    print("Tree traversed in {:.3f} seconds".format(time.time()-st))
+    return tree
+
 def backtrack(tree, node):
     """Walk back up the given tree, returning the sequential set 
     of parent nodes.
     """
-    sequence = [hash(node)]
+    sequence = [node.state]
     child = node
     while child.parent is not None:
-        sequence.append(hash(child.parent))
+        sequence.append(child.parent.state)
         child = child.parent
 
     # we actually want the reverse of this sequence
     sequence.reverse()
     return sequence
 
-def get_children(node, action_dist=1):
-    """Return all child permutations of the given Node.
+@lru_cache(maxsize=None)
+def get_moves(size, action_dist=1):
+    """Return the reachable blank positions for every blank position.
 
     Arguments:
-        node: A square array of state values. The zero element
-            is assumed to be the empty ("action") element.
-        action_dist: The distance which an element can move;
-            1: The "action" element can move to 1 tangential space.
-            2: The "action" element can move to 2 tangential spaces (or 1 diagonal).
-            etc.
-    """
-    # deliberately eschewing sanity checks for speed
-    size = node.shape[0]
-    xi,yi = np.where(node==0)
+        size: The width of the (square) board.
+        action_dist: The distance which an element can move (see `get_children`).
 
+    Returns:
+        A tuple, indexed by flat blank position, of tuples of flat target positions.
+    """
     # build up action set (all "actions" possible)
     action_set = []
     for i in range(action_dist+1):
@@ -84,42 +352,75 @@ def get_children(node, action_dist=1):
             action_set.append((i,-j))
             action_set.append((-i,-j))
 
-    # get the unique set: (very inefficient way of doing this!)
-    action_set = set(action_set)
-
-    children = []
-    for action in action_set:
-        # index of new child:
-        xf = action[0] + xi
-        yf = action[1] + yi
-
-        # ignore actions that put us out of bounds
-        if not 0 <= xf < size:
-            continue
-        if not 0 <= yf < size:
-            continue
-
-        # return permuted child
-        child = node.copy()
-        child[xi,yi],child[xf,yf] = child[xf,yf], child[xi,yi]
-
-        children.append(child)
-
-    return children
-
-
-
-
-
-
-
+    # get the unique set
+    action_set = sorted(set(action_set))
 
+    moves = []
+    for blank in range(size*size):
+        xi,yi = divmod(blank, size)
+        targets = []
+        for action in action_set:
+            # index of new child:
+            xf = action[0] + xi
+            yf = action[1] + yi
 
+            # ignore actions that put us out of bounds
+            if not 0 <= xf < size:
+                continue
+            if not 0 <= yf < size:
+                continue
+            targets.append(xf*size + yf)
+        moves.append(tuple(targets))
+    return tuple(moves)
 
+def get_children(node, action_dist=1):
+    """Return all child permutations of the given Node.
 
+    Arguments:
+        node: A custom.Node. The zero element is assumed to be
+            the empty ("action") element.
+        action_dist: The distance which an element can move;
+            1: The "action" element can move to 1 tangential space.
+            2: The "action" element can move to 2 tangential spaces (or 1 diagonal).
+            etc.
 
+    Returns:
+        A list of (state, blank) tuples of packed child states.
+    """
+    # deliberately eschewing sanity checks for speed
+    bits = tile_bits(node.size)
+    mask = (1 << bits) - 1
+    state = node.state
+    blank_shift = node.blank*bits
 
+    children = []
+    for target in get_moves(node.size, action_dist)[node.blank]:
+        # swap the blank (zero) with the tile at the target position
+        shift = target*bits
+        tile = (state >> shift) & mask
+        children.append((state - (tile << shift) + (tile << blank_shift), target))
 
+    return children
 
+# available search algorithms, by name
+ALGORITHMS = {
+    "bfs": bfs,
+    "bidirectional": bidirectional_bfs,
+    "astar": astar,
+    "idastar": idastar,
+    "table": descend,
+}
 
+# algorithms which require a heuristic
+INFORMED = ("astar", "idastar", "table")
 
+def search(start_node, tree, algorithm="bfs", heuristic=None, verbose=False):
+    """Run the named search algorithm (see `ALGORITHMS`) on the given `tree`.
+    """
+    if algorithm not in ALGORITHMS:
+        raise RuntimeError("Unknown search algorithm '{}'.".format(algorithm))
+    if algorithm in INFORMED:
+        if heuristic is None:
+            raise RuntimeError("Search algorithm '{}' requires a heuristic.".format(algorithm))
+        return ALGORITHMS[algorithm](start_node, tree, heuristic, verbose=verbose)
+    return ALGORITHMS[algorithm](start_node, tree, verbose=verbose)
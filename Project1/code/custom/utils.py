@@ -15,8 +15,30 @@ class Timer(object):
             self.end = time.time()
             print(f"{self.description}: {self.end - self.start}")
 
-def to_file(string, filename):
-    """Print given string object to a file.
+# size of the write buffer used for output files
+BUFFER_SIZE = 1 << 20
+
+def to_file(lines, filename):
+    """Print given string (or iterable of strings) to a file.
+
+    Iterables (e.g. `Tree.iter_all()`) are streamed through a buffered
+    writer, so the full output never has to be held in memory.
+    """
+    with open(filename, "w", buffering=BUFFER_SIZE) as txtfile:
+        if isinstance(lines, str):
+            txtfile.write(lines)
+        else:
+            txtfile.writelines(lines)
+
+def to_csv(rows, filename):
+    """Stream the given iterable of dicts to a CSV file.
+
+    The header is taken from the keys of the first row.
     """
-    with open(filename, "w") as txtfile:
-        txtfile.write(string)
+    with open(filename, "w", newline="") as csvfile:
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(csvfile, fieldnames=list(row.keys()))
+                writer.writeheader()
+            writer.writerow(row)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+
+import argparse
+import numpy as np
+from custom.node import random_states
+
+def parse_args():
+    """Parse command line args
+    """
+    parser = argparse.ArgumentParser(description="Generate random solveable start nodes.")
+    parser.add_argument("-n", "--number", type=int, default=9, help="Size of puzzle.")
+    parser.add_argument("-c", "--count", type=int, default=100, help="Number of start nodes to generate.")
+    parser.add_argument("-S", "--seed", type=int, default=None, help="Random seed.")
+    parser.add_argument("-o", "--output", type=str, default="starts.txt", help="Output file.")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    # parse arguments
+    args = parse_args()
+
+    # generate and save our start nodes; one (row-major) node per line
+    states = random_states(args.number, args.count, args.seed)
+    np.savetxt(args.output, states, fmt="%d")
+    print("Saved {} start nodes to '{}'".format(args.count, args.output))
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 
 import sys
+import time
 import argparse
 import numpy as np
-from custom.utils import to_file
-from custom.node import Tree, Node, make_node
-from custom.traverse import get_children, bfs, backtrack
+from custom.utils import to_file, to_csv
+from custom.node import Tree, Node, make_node, random_states
+from custom.traverse import get_children, search, backtrack, ALGORITHMS, INFORMED
+from custom.heuristic import HEURISTICS, get_heuristic
+from custom.batch import solve_batch
 
 def parse_args():
     """Parse command line args
@@ -14,12 +17,27 @@ def parse_args():
     parser.add_argument("-n", "--number", type=int, default=9, help="Size of puzzle to solve.")
     parser.add_argument("-r", "--random", type=bool, default=True, help="Solve a random puzzle.")
     parser.add_argument("-s", "--start", nargs="+", type=int, required=False, help="Initial start node (as a list).")
+    parser.add_argument("-a", "--algorithm", default="bfs", choices=list(ALGORITHMS.keys()), help="Search algorithm to use.")
+    parser.add_argument("-H", "--heuristic", default="linear", choices=list(HEURISTICS.keys()) + ["pdb", "table"], help="Heuristic used by informed searches.")
+    parser.add_argument("-p", "--pdb", type=str, default="pdb", help="Pattern database or distance table directory (see build_pdb.py).")
+    parser.add_argument("-b", "--batch", type=str, required=False, help="File of start nodes (one per line) to solve in parallel.")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of processes used in batch mode.")
+    parser.add_argument("-o", "--results", type=str, default="results.csv", help="Results file for batch mode.")
 
     # parse args
     args = parser.parse_args()
 
+    # the distance table search requires its own "heuristic"
+    if args.algorithm == "table":
+        args.heuristic = "table"
+
     # determine run mode based on input flags
-    if args.start:
+    if args.batch:
+        # in batch mode all start nodes come from the given file
+        args.start = np.loadtxt(args.batch, dtype=int, ndmin=2)
+        args.number = args.start.shape[1]
+        args.random = False
+    elif args.start:
         # if we're given an argument list, ignore other args
         args.number = len(args.start)
         args.random = False
@@ -37,6 +55,14 @@ if __name__ == "__main__":
     goal_node = make_node(goal)
     print("Goal node: {}".format(goal_node))
 
+    if args.batch:
+        # solve all the given start nodes in parallel
+        print("Solving {} start nodes from '{}'...".format(len(args.start), args.batch))
+        st = time.time()
+        to_csv(solve_batch(args.start, goal, args.algorithm, args.heuristic, args.pdb, args.jobs), args.results)
+        print("Solved in {:.3f} seconds; results saved to '{}'".format(time.time()-st, args.results))
+        sys.exit(0)
+
     # define a random start node
     if args.start:
         # use the user input node
@@ -44,17 +70,16 @@ if __name__ == "__main__":
         if not start_node.solveable():
             raise RuntimeError("Given node {} is not solveable.".format(args.start))       
     else:
-        # make a random starting node
-        start_node = make_node(np.random.permutation(goal_node.state.flatten()))
-        while not start_node.solveable():
-            start_node = make_node(np.random.permutation(goal_node.state.flatten()))
+        # make a random (solveable) starting node
+        start_node = make_node(random_states(args.number)[0])
     print("Start node: {}".format(start_node))
 
     # initialize our tree
     tree = Tree(goal_node)
 
-    # build out the brute force search of all paths
-    tree = bfs(start_node, tree, verbose=False)
+    # perform our search
+    heuristic = get_heuristic(args.heuristic, goal_node, args.pdb) if args.algorithm in INFORMED else None
+    tree = search(start_node, tree, args.algorithm, heuristic, verbose=False)
 
     # find the optimal successful path
     if not tree.successes:
@@ -63,9 +88,9 @@ if __name__ == "__main__":
         print("Optimal solution length: {}".format(tree.optimal_path_length))
 
     # print our results
-    to_file(tree.print_soln(), "nodePath.txt")
-    to_file(tree.print_all(), "Nodes.txt")
-    to_file(tree.print_info(), "NodesInfo.txt")
+    to_file(tree.iter_soln(), "nodePath.txt")
+    to_file(tree.iter_all(), "Nodes.txt")
+    to_file(tree.iter_info(), "NodesInfo.txt")
 
     # import code
     # code.interact(local=locals())
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Benchmark graph construction and Dijkstra on a fixed set of queries.
+"""
+import csv
+import json
+import argparse
+from dijkstra.queue import QUEUES
+from dijkstra.benchmark import make_suite, run_suite, metadata, compare, MAPS, GRAPHS, PLANNERS
+
+def improvisation():
+    parser = argparse.ArgumentParser(description="Benchmark Dijkstra on a fixed (seeded) set of start / goal pairs.")
+    parser.add_argument("-m", "--maps", default=list(MAPS.keys()), nargs='+', choices=list(MAPS.keys()), help="Maps to benchmark on.")
+    parser.add_argument("-c", "--count", default=5, type=int, help="Number of start / goal pairs per map.")
+    parser.add_argument("-S", "--seed", default=0, type=int, help="Random seed for the start / goal pairs.")
+    parser.add_argument("-b", "--buffer", default=0, type=float, help="Obstacle buffer (i.e. robot radius plus clearance).")
+    parser.add_argument("-G", "--graph", default="full", choices=list(GRAPHS.keys()), help="Graph type.")
+    parser.add_argument("-P", "--planner", default="dijkstra", choices=list(PLANNERS.keys()), help="Search algorithm.")
+    parser.add_argument("-q", "--queue", default="bucket", choices=list(QUEUES.keys()), help="Priority queue type.")
+    parser.add_argument("-n", "--no-verify", action="store_true", help="Skip checking path costs against the reference solver.")
+    parser.add_argument("-o", "--output", default="benchmark.json", type=str, help="Output results file (.json or .csv).")
+    parser.add_argument("--baseline", default=None, type=str, help="Previous (JSON) results file to compare against.")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    # get args
+    args = improvisation()
+
+    # generate our fixed set of queries
+    cases = make_suite(args.maps, args.count, args.seed, args.buffer)
+    print("Benchmarking {} queries...".format(len(cases)))
+
+    # run each query in isolation and save the results
+    results = list(run_suite(cases, args.graph, args.queue, not args.no_verify, True, args.planner))
+    if args.output.endswith(".csv"):
+        with open(args.output, "w", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        settings = metadata(maps=args.maps, count=args.count, seed=args.seed, buffer=args.buffer,
+                            graph=args.graph, queue=args.queue, planner=args.planner)
+        with open(args.output, "w") as jsonfile:
+            json.dump({"metadata": settings, "results": results}, jsonfile, indent=2)
+    print("Results saved to '{}'".format(args.output))
+
+    # check path costs
+    failures = [r for r in results if not r.get("cost_ok", True)]
+    if failures:
+        print("{} of {} path costs don't match the reference solver!".format(len(failures), len(results)))
+
+    # compare against a previous run
+    if args.baseline:
+        with open(args.baseline) as jsonfile:
+            baseline = json.load(jsonfile)["results"]
+        for row in compare(results, baseline):
+            print("{map}: {build_ratio:.2f}x build time, {solve_ratio:.2f}x solve time, {cost_mismatches} cost mismatches vs baseline.".format(**row))
@@ -0,0 +1,80 @@
+"""Solve many single source problems in parallel, across a pool of processes.
+
+The (read-only) graph is shared between the processes via shared memory
+(or, for a CSRGraph, its memory mapped files) rather than being copied
+into each of them.
+"""
+import copy
+import numpy as np
+from multiprocessing import Pool, shared_memory
+from .graph import CSRGraph
+from .dijkstra import Dijkstra
+
+# per-process solver settings (see `_initialize`)
+_settings = {}
+
+def _initialize(graph, name, queue):
+    """Set up a worker process; attach the graph to the shared valid cells.
+
+    Memory mapped (CSRGraph) graphs are shared via their files instead.
+    """
+    if name is not None:
+        shm = shared_memory.SharedMemory(name=name)
+        graph.valid = np.ndarray(graph.size, dtype=bool, buffer=shm.buf)
+        graph._valid = memoryview(graph.valid)
+        _settings["shm"] = shm
+    _settings["graph"] = graph
+    _settings["queue"] = queue
+
+def _stub_map(map_):
+    """Return a shallow copy of the given map, without its (large) cached grids.
+    """
+    stub = copy.copy(map_)
+    stub._occupancy = {}
+    stub._clearance = {}
+    return stub
+
+def _solve(src):
+    """Solve the full shortest path tree from a single source.
+    """
+    d = Dijkstra(_settings["graph"], src, _settings["queue"])
+    d.solve()
+    return d.get_solution()
+
+def solve_batch(graph, sources, queue="bucket", jobs=None):
+    """Solve for the shortest path tree from each of the given sources in parallel.
+
+    Args:
+        graph: The graph.Graph to search (shared by all processes).
+        sources: An iterable of source node.Node objects.
+        queue: Priority queue type (see `queue.QUEUES`).
+        jobs: Number of processes (defaults to the number of CPUs).
+
+    Yields:
+        A solved Dijkstra object per source, in order.
+    """
+    sources = list(sources)
+
+    # copy our valid cells into shared memory; workers get the graph without them
+    #  (memory mapped graphs are pickled by reference to their files instead),
+    #  and its map without its cached occupancy / clearance grids
+    shm = None
+    stub = copy.copy(graph)
+    if graph.map_ is not None:
+        stub.map_ = _stub_map(graph.map_)
+    if not isinstance(graph, CSRGraph):
+        shm = shared_memory.SharedMemory(create=True, size=graph.valid.nbytes)
+        np.ndarray(graph.valid.shape, dtype=bool, buffer=shm.buf)[:] = graph.valid
+        stub.valid = np.zeros(0, dtype=bool)
+
+    try:
+        initargs = (stub, None if shm is None else shm.name, queue)
+        with Pool(jobs, initializer=_initialize, initargs=initargs) as pool:
+            for src, solution in zip(sources, pool.imap(_solve, sources)):
+                d = Dijkstra(graph, src, queue)
+                d.set_solution(**solution)
+                yield d
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
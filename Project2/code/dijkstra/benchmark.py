@@ -0,0 +1,197 @@
+"""Benchmarking of the graph / Dijkstra implementations.
+
+A benchmark suite is a fixed (seeded) set of valid start / goal pairs per
+map. Each query is run in a fresh process, so that the peak resident
+memory reported for it isn't polluted by earlier queries. Path costs are
+checked against a simple, independent reference implementation.
+"""
+import sys
+import time
+import heapq
+import resource
+import platform
+from multiprocessing import Pool
+import numpy as np
+from .map import TestMap, FinalMap
+from .node import Node
+from .graph import Graph, ImplicitGraph
+from .dijkstra import Dijkstra
+from .jps import JumpPointSearch
+
+# available maps and graph types, by name
+MAPS = {
+    "test": TestMap,
+    "final": FinalMap,
+}
+GRAPHS = {
+    "full": Graph,
+    "lazy": ImplicitGraph,
+}
+PLANNERS = {
+    "dijkstra": Dijkstra,
+    "jps": JumpPointSearch,
+}
+
+# tolerance used when comparing path costs
+TOLERANCE = 1e-6
+
+def make_suite(maps=("test", "final"), count=5, seed=0, buffer_=0):
+    """Generate a fixed set of (valid) start / goal pairs, `count` per map.
+
+    Returns:
+        A list of {"map", "buffer", "start", "goal"} cases.
+    """
+    rng = np.random.default_rng(seed)
+    cases = []
+    for name in maps:
+        map_ = MAPS[name]()
+        valid = np.argwhere(map_.occupancy(buffer_)) + map_.min_corner
+        for _ in range(count):
+            start, goal = valid[rng.choice(len(valid), 2, replace=False)]
+            cases.append({"map": name, "buffer": buffer_, "start": start.tolist(), "goal": goal.tolist()})
+    return cases
+
+def peak_memory():
+    """Return the peak resident memory of this process, in KB.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return usage // 1024 if sys.platform == "darwin" else usage
+
+def reference_cost(map_, buffer_, start, goal):
+    """Return the optimal path cost via a plain (dict and heapq based) Dijkstra.
+
+    This deliberately shares nothing with `Graph` / `Dijkstra` beyond the
+    map and the action set, so that it can catch regressions in either.
+    """
+    valid = map_.occupancy(buffer_)
+    offset = map_.min_corner
+    start, goal = tuple(start), tuple(goal)
+    dist = {start: 0.0}
+    Q = [(0.0, start)]
+    while Q:
+        cost, (x, y) = heapq.heappop(Q)
+        if (x, y) == goal:
+            return float(cost)
+        if cost > dist[(x, y)]:
+            continue
+        for (dx, dy), step in Node.actions_.items():
+            child = (x+dx, y+dy)
+            ix, iy = child[0]-offset[0], child[1]-offset[1]
+            if not (0 <= ix < valid.shape[0] and 0 <= iy < valid.shape[1] and valid[ix,iy]):
+                continue
+            alt = cost + step
+            if alt < dist.get(child, np.inf):
+                dist[child] = alt
+                heapq.heappush(Q, (alt, child))
+    return None
+
+def run_case(case, graph="full", queue="bucket", verify=True, planner="dijkstra"):
+    """Run a single benchmark query, returning a dict of results.
+    """
+    map_ = MAPS[case["map"]]()
+    start_node = Node(np.array(case["start"]))
+    goal_node = Node(np.array(case["goal"]))
+
+    st = time.time()
+    g = GRAPHS[graph](map_, start_node, case["buffer"])
+    build_time = time.time() - st
+
+    st = time.time()
+    if planner == "dijkstra":
+        d = Dijkstra(g, start_node, queue)
+    else:
+        d = PLANNERS[planner](g, start_node)
+    d.solve(goal_node)
+    try:
+        path, cost = d.get_path(goal_node)
+    except RuntimeError:
+        # goal not reachable from the start
+        path, cost = [], None
+    solve_time = time.time() - st
+
+    result = {
+        "map": case["map"],
+        "buffer": case["buffer"],
+        "planner": planner,
+        "start": " ".join([str(v) for v in case["start"]]),
+        "goal": " ".join([str(v) for v in case["goal"]]),
+        "build_time": build_time,
+        "solve_time": solve_time,
+        "settled": len(d._visited),
+        "pushes": d.queue.pushes,
+        "updates": d.queue.updates,
+        "pops": d.queue.pops,
+        "cost": cost,
+        "path_length": len(path),
+        "peak_rss_kb": peak_memory(),
+    }
+    if verify:
+        reference = reference_cost(map_, case["buffer"], case["start"], case["goal"])
+        result["reference_cost"] = reference
+        result["cost_ok"] = bool((cost is None and reference is None) or \
+            (cost is not None and reference is not None and abs(cost - reference) < TOLERANCE))
+    return result
+
+def _run_isolated(job):
+    """Pool worker; run a single case.
+    """
+    return run_case(*job)
+
+def run_suite(cases, graph="full", queue="bucket", verify=True, verbose=False, planner="dijkstra"):
+    """Run every case of the suite, each in a fresh process.
+
+    Yields:
+        A dict of results per case, in order.
+    """
+    jobs = [(case, graph, queue, verify, planner) for case in cases]
+    with Pool(1, maxtasksperchild=1) as pool:
+        for result in pool.imap(_run_isolated, jobs):
+            if verbose:
+                msg = "{map} ({start}) -> ({goal}): built in {build_time:.3f}s, solved in {solve_time:.3f}s, {settled} nodes settled, cost {cost}."
+                print(msg.format(**result))
+            yield result
+
+def metadata(**kwargs):
+    """Return information about the benchmark environment (plus the given settings).
+    """
+    result = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    result.update(kwargs)
+    return result
+
+def compare(results, baseline):
+    """Compare the totals of two sets of results, per map.
+
+    Returns:
+        A list of {"map", "build_ratio", "solve_ratio", "cost_mismatches"} dicts (current / baseline).
+    """
+    def totals(rows):
+        summary = {}
+        for row in rows:
+            build, solve = summary.get(row["map"], (0.0, 0.0))
+            summary[row["map"]] = (build + row["build_time"], solve + row["solve_time"])
+        return summary
+
+    # path costs of matching queries should be identical
+    costs = {(row["map"], row["buffer"], row["start"], row["goal"]): row["cost"] for row in baseline}
+    mismatches = {}
+    for row in results:
+        previous = costs.get((row["map"], row["buffer"], row["start"], row["goal"]), row["cost"])
+        if (previous is None) != (row["cost"] is None) or \
+                (previous is not None and abs(previous - row["cost"]) >= TOLERANCE):
+            mismatches[row["map"]] = mismatches.get(row["map"], 0) + 1
+
+    current, previous = totals(results), totals(baseline)
+    comparison = []
+    for name in sorted(set(current) & set(previous)):
+        comparison.append({
+            "map": name,
+            "build_ratio": current[name][0] / previous[name][0] if previous[name][0] else None,
+            "solve_ratio": current[name][1] / previous[name][1] if previous[name][1] else None,
+            "cost_mismatches": mismatches.get(name, 0),
+        })
+    return comparison
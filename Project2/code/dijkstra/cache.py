@@ -0,0 +1,110 @@
+"""Cache of solved shortest path trees.
+
+Solutions are keyed by (map, buffer, graph layout, source) and kept both in memory
+(least recently used entries are evicted first) and, optionally, on disk
+as `.npz` files. The map is identified by its signature (see
+`Map.signature`), so changing any obstacle invalidates its solutions.
+Solutions are indexed like the graph they were solved on, so those of
+grid graphs (`Graph`, `ImplicitGraph`) and memory mapped ones (`CSRGraph`)
+are kept apart.
+"""
+
+import os
+import glob
+import numpy as np
+from collections import OrderedDict
+from .node import Node
+from .graph import CSRGraph
+from .dijkstra import Dijkstra
+
+class SolutionCache:
+    """Store and reuse full Dijkstra solutions.
+    """
+    def __init__(self, directory=None, capacity=16):
+        # directory to persist solutions to (None for memory only)
+        self.directory = directory
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+        # in-memory solutions, in order of use (key: value) -> (key: solution)
+        self.capacity = capacity
+        self._entries = OrderedDict()
+
+        # statistics
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, graph, src):
+        """Return the key of the given query.
+        """
+        if not isinstance(src, Node):
+            raise TypeError("src input must be of class node.Node")
+        if graph.map_ is None:
+            raise RuntimeError("Cannot cache solutions of a graph without its map.")
+        x, y = [int(v) for v in src.vertices]
+        layout = "csr" if isinstance(graph, CSRGraph) else "grid"
+        map_ = graph.map_
+        return "{}_{}_b{:g}_{}{}_{}_{}".format(type(map_).__name__, map_.signature()[:16], graph.buffer_, layout, graph.size, x, y)
+
+    def _filename(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, graph, src):
+        """Return the cached solution of the given query (or None).
+        """
+        key = self.key(graph, src)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        if self.directory is not None and os.path.isfile(self._filename(key)):
+            with np.load(self._filename(key)) as data:
+                solution = {name: data[name] for name in data.files}
+            self._insert(key, solution)
+            return solution
+        return None
+
+    def put(self, graph, src, solution):
+        """Store the given solution (see `Dijkstra.get_solution`).
+        """
+        key = self.key(graph, src)
+        self.invalidate(graph.map_)
+        self._insert(key, solution)
+        if self.directory is not None:
+            np.savez(self._filename(key), **solution)
+
+    def _insert(self, key, solution):
+        self._entries[key] = solution
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, map_):
+        """Remove all solutions for outdated versions (signatures) of the given map.
+        """
+        prefix = type(map_).__name__ + "_"
+        current = prefix + map_.signature()[:16] + "_"
+        for key in list(self._entries.keys()):
+            if key.startswith(prefix) and not key.startswith(current):
+                del self._entries[key]
+        if self.directory is not None:
+            for filename in glob.glob(os.path.join(self.directory, prefix + "*.npz")):
+                if not os.path.basename(filename).startswith(current):
+                    os.remove(filename)
+
+    def solve(self, graph, src, queue="bucket"):
+        """Return a solved Dijkstra object for the given graph and source.
+
+        Cached solutions are reused; otherwise the full shortest path tree
+        is solved for (and cached), so that any later query from the same
+        source can be answered by backtracking alone.
+        """
+        d = Dijkstra(graph, src, queue)
+        solution = self.get(graph, src)
+        if solution is None:
+            self.misses += 1
+            d.solve()
+            self.put(graph, src, d.get_solution())
+        else:
+            self.hits += 1
+            d.set_solution(**solution)
+        return d
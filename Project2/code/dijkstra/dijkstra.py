@@ -4,106 +4,186 @@
 https://en.wikipedia.org/wiki/Dijkstra%27s_algorithm
 """
 import numpy as np
-from heapq import heappush, heappop
-from collections import defaultdict, OrderedDict
 from .node import Node
 from .graph import Graph
+from .queue import QUEUES
 
 class Dijkstra:
-    def __init__(self, graph, src):
+    def __init__(self, graph, src, queue="bucket"):
+        """
+        Args:
+            graph: The graph.Graph to search.
+            src: The source node, or an iterable of source nodes; with
+                multiple sources each cell is labelled by its nearest source.
+            queue: Priority queue type (see `queue.QUEUES`).
+        """
         # sanity checks
         if not isinstance(graph, Graph):
             raise TypeError("graph input must be of class graph.Graph")
-        if not isinstance(src, Node):
-            raise TypeError("src input must be of class node.Node")
+        sources = [src] if isinstance(src, Node) else list(src)
+        if len(sources) == 0 or not all([isinstance(s, Node) for s in sources]):
+            raise TypeError("src input must be of class node.Node (or an iterable of them)")
+        if queue not in QUEUES:
+            raise ValueError("Unknown queue type '{}'.".format(queue))
         self.graph = graph
         self.src = src
-        self.src_hash = hash(src)
+        self.src_indices = [graph.index(s) for s in sources]
+        self.queue_type = queue
 
         # initialize solution lists
         self._dist = None
         self._prev = None
+        self._label = None
+        self._visited = None
+        self._settled = None
+        self.queue = None
 
-    def solve(self):
+    def solve(self, dst=None):
         """Find the shortest path from source to target in the
         given graph.
+
+        Args:
+            dst: (Optional) destination node (or iterable of nodes); if given
+                the search stops as soon as all of them have been reached.
+                Otherwise the full shortest path tree is computed.
         """
-        # construct queue of vertices
-        Q = []
+        if dst is None:
+            targets = set()
+        elif isinstance(dst, Node):
+            targets = {self.graph.index(dst)}
+        else:
+            targets = set([self.graph.index(d) for d in dst])
+
+        # construct queue of vertices; buckets are as wide as the cheapest edge
+        if self.queue_type == "bucket":
+            Q = QUEUES[self.queue_type](self.graph.size, min(self.graph.costs))
+        else:
+            Q = QUEUES[self.queue_type](self.graph.size)
         
-        # construct dicts of distances / predecessors
-        dist = defaultdict(lambda: np.inf)
-        prev = defaultdict(lambda: None)
-
-        # collect visited nodes (for visualization) 
-        visited = OrderedDict()
+        # construct arrays of distances / predecessors (indexed by cell)
+        dist = np.full(self.graph.size, np.inf)
+        prev = np.full(self.graph.size, -1, dtype=np.int64)
+        label = np.full(self.graph.size, -1, dtype=np.int64)
+
+        # collect visited cells (for visualization), and which are settled
+        visited = []
+        settled = np.zeros(self.graph.size, dtype=bool)
         
-        # initialize source node
-        dist[self.src_hash] = 0
-
-        # initialize Queue
-        for node_hash in self.graph.nodes.keys():
-            heappush(Q, (dist[node_hash], node_hash))
+        # (memoryviews give much faster scalar access to the arrays)
+        dist_, prev_, settled_ = memoryview(dist), memoryview(prev), memoryview(settled)
+        label_ = memoryview(label)
+
+        # initialize source node(s)
+        for i,src_index in enumerate(self.src_indices):
+            if src_index in self.graph and dist[src_index] != 0:
+                dist[src_index] = 0
+                label[src_index] = i
+                Q.push(src_index, 0.0)
       
         # core dijkstra algorithm
         while len(Q) != 0:
 
             # get the node with the lowest cost
-            u_cost,u = heappop(Q)
-            
-            # ignore nodes we've already visited (they're invalid)
-            if u in visited.keys():
-                continue
+            u_cost,u = Q.pop()
             
             # mark as visited
-            visited[u] = u_cost
+            settled_[u] = True
+            visited.append(u)
+
+            # stop once we've found all our destinations
+            if u in targets:
+                targets.remove(u)
+                if len(targets) == 0:
+                    break
 
-            for v,v_cost in self.graph.tree[u].items():
+            for v,v_cost in self.graph.neighbours(u):
                 # ignore already processed nodes
-                if v in visited.keys():
+                if settled_[v]:
                     continue
 
                 # update the weights of each child node
-                alt = dist[u] + v_cost
-                if alt < dist[v]:
-                    dist[v] = alt
-                    prev[v] = u
+                alt = u_cost + v_cost
+                if alt < dist_[v]:
+                    dist_[v] = alt
+                    prev_[v] = u
+                    label_[v] = label_[u]
                     
                     # update value
-                    heappush(Q,(dist[v],v))
+                    Q.push(v, alt)
 
         # set solution to class variables
         self._dist = dist
         self._prev = prev
+        self._label = label
         self._visited = visited
+        self._settled = settled
+        self.queue = Q
     
+    def get_solution(self):
+        """Return our solution arrays (distances, predecessors and exploration order).
+        """
+        if self._dist is None:
+            raise RuntimeError("Cannot return solution; call `solve` first.")
+        return {
+            "dist": self._dist,
+            "prev": self._prev,
+            "label": self._label,
+            "visited": np.array(self._visited, dtype=np.int64),
+        }
+
+    def set_solution(self, dist, prev, visited, label=None):
+        """Restore a full (i.e. untargeted) solution given by `get_solution`.
+        """
+        if len(dist) != self.graph.size or len(prev) != self.graph.size:
+            raise ValueError("Solution arrays don't match the size of the graph.")
+        self._dist = dist
+        self._prev = prev
+        self._label = np.where(np.isfinite(dist), 0, -1) if label is None else label
+        self._visited = [int(v) for v in visited]
+        self._settled = np.isfinite(dist)
+
     def get_path(self, dst):
         """Get the optimal path and cost to the given destination node.
         """
         # sanity checks
-        current_hash = hash(dst)
         if self._dist is None:
             raise RuntimeError("Cannot return optimal path; call `solve` first.")
         if not isinstance(dst, Node):
             raise TypeError("dst input must be of class node.Node")
-        if current_hash not in self.graph.nodes.keys():
+        current = self.graph.index(dst)
+        if current not in self.graph:
             raise RuntimeError("Given destination node not found in graph.")
+        if not self._settled[current]:
+            raise RuntimeError("Given destination node wasn't reached; was it passed to `solve`?")
 
         # backtrack to start node
         path = []
-        cost = self._dist[current_hash]
-        while current_hash in self._prev.keys():
-            path.append(current_hash)
-            current_hash = self._prev[current_hash]
-        path.append(self.src_hash)
+        cost = float(self._dist[current])
+        while current != -1:
+            path.append(current)
+            current = int(self._prev[current])
 
         # reverse to give path from start to goal
         path.reverse()
 
         # actually return the node elements (more interesting)
-        path = [self.graph.nodes[p] for p in path] 
+        nodes = []
+        for p in path:
+            nodes.append(self.graph.node(p, float(self._dist[p]), nodes[-1] if nodes else None))
 
-        return path,cost 
+        return nodes,cost 
+
+    def get_field(self):
+        """Get the distance (to the nearest source) and source label of every cell.
+
+        Returns:
+            (dist, label): Arrays indexed like `Map.occupancy`; unreached
+                cells have a distance of inf and a label of -1. Labels
+                index the sources given to the constructor.
+        """
+        if self._dist is None:
+            raise RuntimeError("Cannot return distance field; call `solve` first.")
+        return self.graph.to_grid(self._dist), self.graph.to_grid(self._label)
 
     def get_exploration(self, stop_on_goal=False, dst=None):
         """Returns all the nodes that we explored (in order)
@@ -116,18 +196,15 @@ class Dijkstra:
             raise RuntimeError("Cannot return explored nodes; call `solve` first.")
         if stop_on_goal and dst is None:
             raise RuntimeError("If stop_on_goal is True a goal node must be provided.")
+        goal = self.graph.index(dst) if stop_on_goal else None
 
         explored_nodes = []
         explored_costs = []
-        for hash_, cost in self._visited.items():
-            explored_nodes.append(self.graph.nodes[hash_])
-            explored_costs.append(cost)
+        for index in self._visited:
+            explored_nodes.append(self.graph.node(index, float(self._dist[index])))
+            explored_costs.append(float(self._dist[index]))
 
-            if stop_on_goal and self.graph.nodes[hash_]==dst:
+            if index == goal:
                 break
 
         return explored_nodes, explored_costs
-            
-
-        
-
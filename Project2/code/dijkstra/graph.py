@@ -1,11 +1,25 @@
 """Class representing the Graph of Nodes (derived via BFS)
+
+The graph is stored as a flat (padded) grid of integer cell indices; edges
+are implicit, given by the 8-connected actions of `Node.actions_`. Built
+graphs can be saved in an explicit (CSR) form and memory mapped back in
+via `CSRGraph`.
 """
 
-from collections import defaultdict
+import os
+import json
+import numpy as np
 from .node import Node
 
+# number of nodes written at once when saving a graph
+CHUNK_SIZE = 1 << 20
+
 class Graph:
     """Iteratively build and store a graph of Nodes from a given start.
+
+    Cells are indexed by [x - min_x + 1, y - min_y + 1] into a grid padded
+    by one (invalid) cell on each side, so that neighbouring indices never
+    leave the grid.
     """
     def __init__(self, map_, start_node, buffer_=0):
         # map of obstacle space; used to in collision detection
@@ -13,58 +27,234 @@ class Graph:
 
         # buffer size to use (i.e. robot radius
         self.buffer_ = buffer_
-        
+
         # sanity check input
         if not isinstance(start_node, Node):
             raise ValueError("Start node given to Graph isn't a Node object.")
 
-        # nodes: dict of explored nodes (key: value) -> (hash: node)
-        # tree: hierarchical relationships between nodes (parent: children)
-        self.nodes, self.tree = self.construct(start_node)
+        # grid of valid cells (padded), and its flat (row-major) version
+        occupancy = self.map_.occupancy(self.buffer_)
+        self.shape = (occupancy.shape[0]+2, occupancy.shape[1]+2)
+        self.size = self.shape[0]*self.shape[1]
+        grid = np.zeros(self.shape, dtype=bool)
+        grid[1:-1,1:-1] = occupancy
+
+        # offsets (in flat indices) and costs of each action
+        self.offsets = [int(dx*self.shape[1] + dy) for dx,dy in Node.actions_.keys()]
+        self.costs = [float(cost) for cost in Node.actions_.values()]
+
+        # valid: flat array of cells that belong to the graph
+        self.valid = self.construct(grid, self.index(start_node))
+        self._valid = memoryview(self.valid)
+
+    def construct(self, grid, start):
+        """Find the set of valid cells reachable from our start cell.
+
+        The search is done a whole (BFS) layer at a time, via `Node.expand`.
+        """
+        valid = np.zeros(self.shape, dtype=bool)
+        current = np.array([divmod(start, self.shape[1])])
+        if not grid[current[0,0], current[0,1]]:
+            return valid.ravel()
+
+        valid[current[:,0], current[:,1]] = True
+        while len(current) != 0:
+            children, _, _ = Node.expand(current, grid)
+            children = children[~valid[children[:,0], children[:,1]]]
+
+            # remove duplicates (children shared by multiple parents)
+            flat = np.unique(children[:,0]*self.shape[1] + children[:,1])
+            current = np.column_stack(np.divmod(flat, self.shape[1]))
+            valid[current[:,0], current[:,1]] = True
+        return valid.ravel()
+
+    def index(self, node):
+        """Return the flat cell index of the given Node (or point).
+        """
+        pt = node.vertices if isinstance(node, Node) else node
+        x = int(pt[0] - self.map_.min_corner[0]) + 1
+        y = int(pt[1] - self.map_.min_corner[1]) + 1
+        if not (0 < x < self.shape[0]-1 and 0 < y < self.shape[1]-1):
+            raise RuntimeError("Point {} is outside of the graph.".format(pt))
+        return x*self.shape[1] + y
+
+    def vertices(self, index):
+        """Return the (x,y) position of the given cell index.
+        """
+        x, y = divmod(int(index), self.shape[1])
+        return np.array([x-1, y-1]) + self.map_.min_corner
+
+    def node(self, index, cost2come=0, parent=None):
+        """Construct the Node corresponding to the given cell index.
+        """
+        return Node(self.vertices(index), cost2come, parent)
+
+    def to_grid(self, array):
+        """Reshape the given flat (per cell) array to the shape of `Map.occupancy`.
+        """
+        return np.asarray(array).reshape(self.shape)[1:-1,1:-1]
+
+    def __getstate__(self):
+        # memoryviews can't be pickled; they're recreated on unpickling
+        state = self.__dict__.copy()
+        del state["_valid"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._valid = memoryview(self.valid)
 
-    def construct(self, start_node):
-        """Build out the set of Nodes, starting from our start node.
+    def __contains__(self, index):
+        return bool(self.valid[index])
+
+    def neighbours(self, index):
+        """Return the (child index, edge cost) pairs of the given cell.
         """
-        tree = defaultdict(dict)
-        nodes = {}
-        
-        current_nodes = [start_node] 
-        while len(current_nodes) != 0:
-            new_nodes = []
-            for node in current_nodes:
-                node_hash = hash(node)
-                
-                # invalid node (obstacle or outside bounds)
-                if not self.map_.is_valid(node.vertices, self.buffer_):
-                    continue
-                
-                # add valid nodes to our tree
-                if node.parent:
-                    tree[hash(node.parent)][node_hash] = node.cost2come - node.parent.cost2come
-               
-                # we've already explored this node
-                if node_hash in nodes.keys():
-                    continue
+        valid = self._valid
+        return [(index+offset, cost) for offset,cost in zip(self.offsets, self.costs) if valid[index+offset]]
 
-                # valid node; add it to our visited nodes
-                nodes[node_hash] = node
-                children = node.get_children()
-                
-                # add children to be processed next round
-                new_nodes += children
+    def save(self, directory):
+        """Save the graph (in CSR form) to the given directory.
 
-            current_nodes = new_nodes
-        return nodes, tree
+        Nodes are numbered in order of their cell index. The directory holds:
+            coords.npy:    (V,2) node positions.
+            indptr.npy:    (V+1,) offsets of each node's edges.
+            indices.npy:   (E,) node ids of each edge's child.
+            costs.npy:     (E,) cost of each edge.
+            ids.npy:       grid (indexed like `Map.occupancy`) of node ids (-1 if invalid).
+            occupancy.npy: the map's obstacle grid.
+            graph.json:    build parameters.
+        Edges are written a chunk of nodes at a time.
+        """
+        os.makedirs(directory, exist_ok=True)
+        cells = np.flatnonzero(self.valid)
+        num_nodes = len(cells)
 
+        # node id of each (padded) cell
+        ids = np.full(self.size, -1, dtype=np.int64)
+        ids[cells] = np.arange(num_nodes)
+        np.save(os.path.join(directory, "ids.npy"), self.to_grid(ids))
+        np.save(os.path.join(directory, "occupancy.npy"), self.map_.occupancy(self.buffer_))
+        coords = np.column_stack(np.divmod(cells, self.shape[1])) - 1 + self.map_.min_corner
+        np.save(os.path.join(directory, "coords.npy"), coords)
 
+        # first pass; count the edges of each node
+        offsets = np.array(self.offsets)
+        indptr = np.zeros(num_nodes+1, dtype=np.int64)
+        for i in range(0, num_nodes, CHUNK_SIZE):
+            children = cells[i:i+CHUNK_SIZE,None] + offsets
+            indptr[i+1:i+1+len(children)] = self.valid[children].sum(axis=1)
+        np.cumsum(indptr, out=indptr)
+        np.save(os.path.join(directory, "indptr.npy"), indptr)
 
+        # second pass; write out the edges
+        open_memmap = np.lib.format.open_memmap
+        num_edges = int(indptr[-1])
+        indices = open_memmap(os.path.join(directory, "indices.npy"), "w+", np.int64, (num_edges,))
+        costs = open_memmap(os.path.join(directory, "costs.npy"), "w+", np.float64, (num_edges,))
+        for i in range(0, num_nodes, CHUNK_SIZE):
+            children = cells[i:i+CHUNK_SIZE,None] + offsets
+            mask = self.valid[children]
+            start, stop = indptr[i], indptr[min(i+CHUNK_SIZE, num_nodes)]
+            indices[start:stop] = ids[children[mask]]
+            costs[start:stop] = np.broadcast_to(self.costs, mask.shape)[mask]
+        indices.flush()
+        costs.flush()
+
+        params = {
+            "map": type(self.map_).__name__,
+            "signature": self.map_.signature(),
+            "buffer": self.buffer_,
+            "min_corner": self.map_.min_corner.tolist(),
+            "nodes": int(num_nodes),
+            "edges": num_edges,
+            "costs": sorted(set(self.costs)),
+        }
+        with open(os.path.join(directory, "graph.json"), "w") as jsonfile:
+            json.dump(params, jsonfile, indent=2)
+
+class ImplicitGraph(Graph):
+    """A Graph whose edges are only checked on demand.
+
+    Nothing is built up front (beyond the map's occupancy grid); cells are
+    checked for validity as each one is expanded by the search.
+    """
+    def construct(self, grid, start):
+        """All valid cells are considered part of the graph.
+        """
+        return grid.ravel()
 
+class CSRGraph(Graph):
+    """A (read-only) Graph saved via `Graph.save`, memory mapped from disk.
 
+    Nothing is loaded up front, so even graphs larger than memory can be
+    searched, and multiple processes opening the same graph share its pages.
+    Nodes are identified by their id (see `Graph.save`) rather than cell index.
+    """
+    def __init__(self, directory, map_=None):
+        """
+        Args:
+            directory: Directory the graph was saved to.
+            map_: (Optional) map to check the graph against; must match the
+                map (and its obstacles) the graph was built from.
+        """
+        self.directory = directory
+        with open(os.path.join(directory, "graph.json")) as jsonfile:
+            self.params = json.load(jsonfile)
+        if map_ is not None and map_.signature() != self.params["signature"]:
+            raise RuntimeError("Graph in '{}' was built for a different map.".format(directory))
+        self.map_ = map_
+        self.buffer_ = self.params["buffer"]
+        self.min_corner = np.array(self.params["min_corner"])
+        self.costs = self.params["costs"]
 
+        def load(name):
+            return np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+        self.coords = load("coords")
+        self.indptr = load("indptr")
+        self.indices = load("indices")
+        self.edge_costs = load("costs")
+        self.ids = load("ids")
+        self.occupancy = load("occupancy")
+        self.size = self.params["nodes"]
 
+    def __getstate__(self):
+        # reopen (i.e. share) the memory mapped files rather than copying them
+        return {"directory": self.directory, "map_": self.map_}
 
+    def __setstate__(self, state):
+        self.__init__(state["directory"], state["map_"])
 
+    def index(self, node):
+        """Return the node id of the given Node (or point).
+        """
+        pt = node.vertices if isinstance(node, Node) else node
+        x = int(pt[0] - self.min_corner[0])
+        y = int(pt[1] - self.min_corner[1])
+        if not (0 <= x < self.ids.shape[0] and 0 <= y < self.ids.shape[1]):
+            raise RuntimeError("Point {} is outside of the graph.".format(pt))
+        return int(self.ids[x, y])
 
+    def vertices(self, index):
+        """Return the (x,y) position of the given node id.
+        """
+        return np.array(self.coords[index])
 
+    def to_grid(self, array):
+        """Scatter the given (per node) array into a grid indexed like `Map.occupancy`.
+        """
+        array = np.asarray(array)
+        fill = np.inf if np.issubdtype(array.dtype, np.floating) else -1
+        grid = np.full(self.ids.shape, fill, dtype=array.dtype)
+        x, y = (self.coords - self.min_corner).T
+        grid[x, y] = array
+        return grid
 
+    def __contains__(self, index):
+        return 0 <= index < self.size
 
+    def neighbours(self, index):
+        """Return the (child id, edge cost) pairs of the given node.
+        """
+        start, stop = self.indptr[index], self.indptr[index+1]
+        return zip(self.indices[start:stop].tolist(), self.edge_costs[start:stop].tolist())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Optimal path search via Jump Point Search (JPS).
+
+JPS is A* on a uniform cost, 8-connected grid which skips over the
+(many) symmetric paths between two points; only "jump points" (cells with
+forced neighbours) are ever put in the queue. As in the rest of this
+package diagonal moves may cut corners, i.e. they're only blocked by the
+target cell itself.
+
+Harabor, D. and Grastien, A. (2011), Online Graph Pruning for Pathfinding on Grid Maps.
+"""
+import numpy as np
+from .node import Node
+from .graph import Graph
+from .queue import IndexedHeap
+
+class JumpPointSearch:
+    def __init__(self, graph, src):
+        """
+        Args:
+            graph: The graph.Graph to search; an ImplicitGraph avoids building
+                anything up front. Only its (padded) valid cells are used.
+            src: The source node.
+        """
+        # sanity checks
+        if not isinstance(graph, Graph):
+            raise TypeError("graph input must be of class graph.Graph")
+        if not isinstance(src, Node):
+            raise TypeError("src input must be of class node.Node")
+        self.graph = graph
+        self.src = src
+        self.src_index = graph.index(src)
+
+        # step costs; JPS requires a uniform cost grid
+        self.straight = float(Node.actions_[(1,0)])
+        self.diagonal = float(Node.actions_[(1,1)])
+
+        # initialize solution lists
+        self._dist = None
+        self._prev = None
+        self._visited = None
+        self.queue = None
+
+    def _octile(self, a, b):
+        """Cost of the (obstacle free) octile distance between two cells.
+        """
+        ax, ay = divmod(a, self.graph.shape[1])
+        bx, by = divmod(b, self.graph.shape[1])
+        dx, dy = abs(ax - bx), abs(ay - by)
+        return self.diagonal*min(dx, dy) + self.straight*abs(dx - dy)
+
+    def _jump(self, n, dx, dy, goal):
+        """Step from `n` in direction (dx,dy) until reaching a jump point.
+
+        Returns:
+            The index of the jump point (or None if we hit an obstacle).
+        """
+        valid, W = self._valid, self.graph.shape[1]
+        d = dx*W + dy
+        while True:
+            n += d
+            if not valid[n]:
+                return None
+            if n == goal:
+                return n
+            if dx and dy:
+                # forced neighbours, or a jump point reachable straight from here
+                if (not valid[n - dx*W] and valid[n - dx*W + dy]) or (not valid[n - dy] and valid[n + dx*W - dy]):
+                    return n
+                if self._jump(n, dx, 0, goal) is not None or self._jump(n, 0, dy, goal) is not None:
+                    return n
+            elif dx:
+                if (not valid[n + 1] and valid[n + d + 1]) or (not valid[n - 1] and valid[n + d - 1]):
+                    return n
+            else:
+                if (not valid[n + W] and valid[n + d + W]) or (not valid[n - W] and valid[n + d - W]):
+                    return n
+
+    def _directions(self, n, parent):
+        """Return the (pruned) directions to search in from cell `n`.
+        """
+        if parent == -1:
+            return list(Node.actions_.keys())
+
+        valid, W = self._valid, self.graph.shape[1]
+        (nx, ny), (px, py) = divmod(n, W), divmod(parent, W)
+        dx, dy = (nx > px) - (nx < px), (ny > py) - (ny < py)
+        if dx and dy:
+            directions = [(dx,0), (0,dy), (dx,dy)]
+            if not valid[n - dx*W]:
+                directions.append((-dx,dy))
+            if not valid[n - dy]:
+                directions.append((dx,-dy))
+        elif dx:
+            directions = [(dx,0)]
+            if not valid[n + 1]:
+                directions.append((dx,1))
+            if not valid[n - 1]:
+                directions.append((dx,-1))
+        else:
+            directions = [(0,dy)]
+            if not valid[n + W]:
+                directions.append((1,dy))
+            if not valid[n - W]:
+                directions.append((-1,dy))
+        return directions
+
+    def solve(self, dst):
+        """Find the shortest path from source to the given destination node.
+        """
+        if not isinstance(dst, Node):
+            raise TypeError("dst input must be of class node.Node")
+        goal = self.graph.index(dst)
+        self._valid = self.graph._valid
+
+        # costs / predecessors of jump points (key: value) -> (index: value)
+        dist = {self.src_index: 0.0}
+        prev = {self.src_index: -1}
+        visited = []
+        closed = set()
+
+        Q = IndexedHeap(self.graph.size)
+        if self.src_index in self.graph and goal in self.graph:
+            Q.push(self.src_index, self._octile(self.src_index, goal))
+
+        while len(Q) != 0:
+            _, u = Q.pop()
+            closed.add(u)
+            visited.append(u)
+            if u == goal:
+                break
+
+            for dx, dy in self._directions(u, prev[u]):
+                v = self._jump(u, dx, dy, goal)
+                if v is None or v in closed:
+                    continue
+                alt = dist[u] + self._octile(u, v)
+                if alt < dist.get(v, np.inf):
+                    dist[v] = alt
+                    prev[v] = u
+                    Q.push(v, alt + self._octile(v, goal))
+
+        # set solution to class variables
+        self._dist = dist
+        self._prev = prev
+        self._visited = visited
+        self.queue = Q
+
+    def get_path(self, dst):
+        """Get the optimal path (every cell along it) and cost to the given destination node.
+        """
+        # sanity checks
+        if self._dist is None:
+            raise RuntimeError("Cannot return optimal path; call `solve` first.")
+        if not isinstance(dst, Node):
+            raise TypeError("dst input must be of class node.Node")
+        current = self.graph.index(dst)
+        if current not in self._visited:
+            raise RuntimeError("Given destination node wasn't reached.")
+
+        # backtrack over jump points to the start node
+        jump_points = []
+        while current != -1:
+            jump_points.append(current)
+            current = self._prev[current]
+        jump_points.reverse()
+
+        # fill in the straight / diagonal segments between jump points
+        W = self.graph.shape[1]
+        path = [self.graph.node(jump_points[0])]
+        for a, b in zip(jump_points[:-1], jump_points[1:]):
+            (ax, ay), (bx, by) = divmod(a, W), divmod(b, W)
+            dx, dy = (bx > ax) - (bx < ax), (by > ay) - (by < ay)
+            step = self.diagonal if dx and dy else self.straight
+            for cell in range(a + dx*W + dy, b + dx*W + dy, dx*W + dy):
+                path.append(self.graph.node(cell, path[-1].cost2come + step, path[-1]))
+
+        return path, self._dist[jump_points[-1]]
+
+    def get_exploration(self, stop_on_goal=False, dst=None):
+        """Returns all the jump points that we expanded (in order)
+        """
+        if self._visited is None:
+            raise RuntimeError("Cannot return explored nodes; call `solve` first.")
+        nodes = [self.graph.node(i, self._dist[i]) for i in self._visited]
+        return nodes, [n.cost2come for n in nodes]
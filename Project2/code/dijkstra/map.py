@@ -1,6 +1,7 @@
 """Obstacle map
 """
 
+import hashlib
 from abc import ABC, abstractmethod
 import numpy as np
 import matplotlib.path as mplPath
@@ -23,14 +24,123 @@ class Map(ABC):
             min_corner
         ]))
 
+        # how obstacles (and workspace bounds) are inflated by a buffer;
+        #  "exact" checks the geometry for each buffer, "transform" thresholds
+        #  a (once computed) distance transform of the obstacle grid.
+        self.inflation = "exact"
+
+        # cache of occupancy grids (key: value) -> ((signature, inflation, buffer): grid)
+        self._occupancy = {}
+
+        # cache of clearance grids (key: value) -> (signature: grid)
+        self._clearance = {}
+
+        # last computed signature, along with the inflation and obstacle versions it was computed for
+        self._signature = (None, None)
+
     def is_in_workspace(self, pt, buffer_=0):
         """Returns True if the given point is within our workspace."""
         return self.workspace.contains_point(pt, radius=-(buffer_+1))
 
     def is_valid(self, pt, buffer_=0):
-        """Returns True if the given point is within our workspace and not an obstacle."""
+        """Returns True if the given point is within our workspace and not an obstacle.
+
+        Integer points are looked up in our (cached) occupancy grid.
+        """
+        x = pt[0] - self.min_corner[0]
+        y = pt[1] - self.min_corner[1]
+        ix, iy = int(x), int(y)
+        if ix == x and iy == y:
+            grid = self.occupancy(buffer_)
+            return 0 <= ix < grid.shape[0] and 0 <= iy < grid.shape[1] and grid.item(ix, iy)
         return self.is_in_workspace(pt, buffer_) and not self.is_obstacle(pt, buffer_)
 
+    def signature(self):
+        """Returns a hash of our workspace bounds, inflation method and obstacle definitions.
+
+        The signature changes whenever an obstacle is added, removed, replaced
+        or modified (i.e. any of its attributes is assigned; see
+        `Obstacle.version`), or the inflation method changes. It is only
+        recomputed when that happens, which also clears our cached grids.
+        """
+        state = (self.inflation, [obstacle.version for obstacle in self.obstacles])
+        if self._signature[0] != state:
+            self._occupancy.clear()
+            self._clearance.clear()
+            sha = hashlib.sha1()
+            sha.update(repr((type(self).__name__, self.min_corner.tolist(), self.max_corner.tolist(), self.inflation)).encode())
+            for obstacle in self.obstacles:
+                sha.update(obstacle.definition().encode())
+            self._signature = (state, sha.hexdigest())
+        return self._signature[1]
+
+    def occupancy(self, buffer_=0):
+        """Returns a boolean grid of the valid integer points in our workspace.
+
+        The grid is indexed by [x - min_x, y - min_y] and is computed (in
+        vectorized form) once per buffer size (and set of obstacles).
+        """
+        if self.inflation not in ("exact", "transform"):
+            raise ValueError("Unknown inflation method '{}'.".format(self.inflation))
+        signature = self.signature()
+        if self.inflation == "transform" and buffer_ != 0:
+            key = (signature, self.inflation, buffer_)
+            if key not in self._occupancy:
+                self._occupancy[key] = self.threshold(buffer_)
+            return self._occupancy[key]
+
+        key = (signature, "exact", buffer_)
+        if key not in self._occupancy:
+            X,Y = np.meshgrid(
+                np.arange(self.min_corner[0], self.max_corner[0]+1),
+                np.arange(self.min_corner[1], self.max_corner[1]+1),
+                indexing="ij")
+            pts = np.column_stack([X.ravel(), Y.ravel()])
+
+            valid = self.workspace.contains_points(pts, radius=-(buffer_+1))
+            for obstacle in self.obstacles:
+                valid &= ~obstacle.within_points(pts, buffer_)
+            self._occupancy[key] = valid.reshape(X.shape)
+        return self._occupancy[key]
+
+    def clearance(self):
+        """Returns the Euclidean distance of each grid point to the nearest invalid point.
+
+        Invalid points are obstacles (without buffer) and anything outside of
+        the workspace; distances are between grid points, not to the obstacle
+        edges (see `threshold`). The grid is indexed like `occupancy` and is
+        computed once per set of obstacles.
+        """
+        signature = self.signature()
+        if signature not in self._clearance:
+            self._clearance[signature] = distance_transform(~self.occupancy(0))
+        return self._clearance[signature]
+
+    def threshold(self, buffer_):
+        """Returns the valid grid points for the given buffer, via our clearance grid.
+
+        The result is conservative, i.e. a subset of the "exact" occupancy
+        grid. Clearance is measured between cell centres, so a point is only
+        accepted if its clearance exceeds the buffer by half a cell diagonal.
+        Polygons are inflated with mitered corners, which reach further than
+        any Euclidean distance; cells around their vertices are also checked
+        against the polygons themselves.
+        """
+        valid = self.clearance() > buffer_ + np.sqrt(2)/2
+
+        # a miter reaches at most 4 times the (half buffer) offset of polygon edges
+        reach = int(np.ceil(2*(buffer_+1))) + 1
+        polygons = [obstacle for obstacle in self.obstacles if isinstance(obstacle, Polygon)]
+        near = np.zeros_like(valid)
+        for polygon in polygons:
+            for x,y in np.round(polygon.pts.vertices - self.min_corner).astype(int):
+                near[max(x-reach,0):max(x+reach+1,0), max(y-reach,0):max(y+reach+1,0)] = True
+        cells = np.argwhere(valid & near)
+        for polygon in polygons:
+            inside = polygon.within_points(cells + self.min_corner, buffer_)
+            valid[tuple(cells[inside].T)] = False
+        return valid
+
     def is_obstacle(self, pt, buffer_=0):
         """Returns True if the given point is in an obstacle."""
         return any([obstacle.within(pt,buffer_) for obstacle in self.obstacles])
@@ -49,6 +159,41 @@ class Map(ABC):
 
         return fig,ax
 
+def distance_transform(obstacles):
+    """Exact Euclidean distance transform of the given boolean grid.
+
+    Returns the distance of every cell to the nearest True cell, treating
+    everything outside the grid as True. Computed in two separable passes:
+    the distance to the nearest obstacle within each column, followed by a
+    minimization over (increasing) horizontal offsets, which stops once no
+    cell can get any closer.
+    """
+    nx, ny = obstacles.shape
+
+    # pad with a ring of obstacles (the outside of the grid)
+    padded = np.ones((nx+2, ny+2), dtype=bool)
+    padded[1:-1,1:-1] = obstacles
+
+    # distance to the nearest obstacle within each column (forward and backward sweeps)
+    column = np.where(padded, 0.0, np.inf)
+    for y in range(1, ny+2):
+        column[:,y] = np.minimum(column[:,y], column[:,y-1] + 1)
+    for y in range(ny, -1, -1):
+        column[:,y] = np.minimum(column[:,y], column[:,y+1] + 1)
+    column **= 2
+
+    # minimize over horizontal offsets; beyond an offset of dx no cell with a
+    #  squared distance below dx**2 can improve
+    result = column.copy()
+    dx = 1
+    while dx < nx+2 and dx*dx < result[1:-1,1:-1].max():
+        shifted = column[dx:] + dx*dx
+        np.minimum(result[:-dx], shifted, out=result[:-dx])
+        shifted = column[:-dx] + dx*dx
+        np.minimum(result[dx:], shifted, out=result[dx:])
+        dx += 1
+    return np.sqrt(result[1:-1,1:-1])
+
 class TestMap(Map):
     def __init__(self):
         super().__init__([0,0],[200,100])
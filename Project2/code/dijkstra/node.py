@@ -13,7 +13,7 @@ class Node:
         (-1,-1): np.sqrt(2),
         (-1, 0): 1,
         (-1, 1): np.sqrt(2),
-        ( 0,-1): np.sqrt(2),
+        ( 0,-1): 1,
         ( 0, 1): 1,
         ( 1,-1): np.sqrt(2),
         ( 1, 0): 1,
@@ -44,34 +44,44 @@ class Node:
             raise RuntimeError("Cannot compare nodes to non-nodes")
         return all(self.vertices == rhs.vertices)
 
-    def get_children(self):
-        """Generate and return a list of all possible child nodes.
-
-        This list is "dumb" in that it ignores workspace bounds
-        and obstacles.
-        """
-        children = []
-        for action, cost in self.actions_.items(): 
-            # calculate child position and cost and store in a new node
-            child = Node(
-                self.vertices + np.array(action),
-                self.cost2come + cost,
-                self
-            )
-
-            # small optimization; don't return parent node
-            if (not self.parent) or child != self.parent:
-                children.append(child)
-        return children
-
-
-
-
-
+    @classmethod
+    def expand(cls, vertices, valid=None):
+        """Vectorized `get_children` of a whole layer of nodes at once.
 
+        Args:
+            vertices: An (N,2) integer array of node positions.
+            valid: (Optional) boolean grid indexed by [x,y]; children
+                outside of it (or on False cells) are dropped.
 
+        Returns:
+            (children, costs, parents): An (M,2) array of child positions,
+                the (M,) cost of each action and the (M,) index (into
+                `vertices`) of each child's parent.
+        """
+        vertices = np.asarray(vertices).reshape(-1,2)
+        actions = np.array(list(cls.actions_.keys()))
+        costs = np.array(list(cls.actions_.values()), dtype=float)
 
+        children = (vertices[:,None,:] + actions[None,:,:]).reshape(-1,2)
+        costs = np.tile(costs, len(vertices))
+        parents = np.repeat(np.arange(len(vertices)), len(actions))
 
+        if valid is not None:
+            x, y = children[:,0], children[:,1]
+            keep = (x >= 0) & (x < valid.shape[0]) & (y >= 0) & (y < valid.shape[1])
+            keep[keep] = valid[x[keep], y[keep]]
+            children, costs, parents = children[keep], costs[keep], parents[keep]
+        return children, costs, parents
 
+    def get_children(self):
+        """Generate and return a list of all possible child nodes.
 
+        This list is "dumb" in that it ignores workspace bounds
+        and obstacles.
+        """
+        children, costs, _ = self.expand(self.vertices)
+        parent = tuple(self.parent.vertices) if self.parent else None
 
+        # small optimization; don't return parent node
+        return [Node(child, self.cost2come + cost, self)
+                for child, cost in zip(children, costs) if tuple(child) != parent]
@@ -0,0 +1,169 @@
+"""Priority queues used by Dijkstra's algorithm.
+
+Both queues hold integer items in [0, size) (i.e. graph cell indices) and
+support decrease-key via `push`, so each item is held at most once.
+
+https://en.wikipedia.org/wiki/Binary_heap
+https://en.wikipedia.org/wiki/Bucket_queue
+"""
+
+import numpy as np
+
+class IndexedHeap:
+    """A binary min-heap with decrease-key.
+
+    The position of each item within the heap is tracked, so that its
+    priority can be lowered in place (instead of pushing a duplicate).
+    """
+    def __init__(self, size):
+        # heap of items, and the priority / heap position of each item
+        self._heap = []
+        self._key = memoryview(np.full(size, np.inf))
+        self._pos = memoryview(np.full(size, -1, dtype=np.int64))
+
+        # statistics; number of insertions, decrease-keys and pops
+        self.pushes = 0
+        self.updates = 0
+        self.pops = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, item, priority):
+        """Insert the given item, or lower its priority if already queued.
+        """
+        pos = self._pos[item]
+        if pos < 0:
+            pos = len(self._heap)
+            self._heap.append(item)
+            self.pushes += 1
+        elif priority < self._key[item]:
+            self.updates += 1
+        else:
+            return
+        self._key[item] = priority
+        self._sift_up(pos)
+
+    def pop(self):
+        """Remove and return the (priority, item) with the lowest priority.
+        """
+        heap = self._heap
+        if not heap:
+            raise IndexError("pop from an empty queue")
+        item = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._pos[last] = 0
+            self._sift_down(0)
+        self._pos[item] = -1
+        self.pops += 1
+        return self._key[item], item
+
+    def _sift_up(self, pos):
+        heap, key, positions = self._heap, self._key, self._pos
+        item = heap[pos]
+        priority = key[item]
+        while pos > 0:
+            parent = (pos - 1) >> 1
+            if key[heap[parent]] <= priority:
+                break
+            heap[pos] = heap[parent]
+            positions[heap[pos]] = pos
+            pos = parent
+        heap[pos] = item
+        positions[item] = pos
+
+    def _sift_down(self, pos):
+        heap, key, positions = self._heap, self._key, self._pos
+        size = len(heap)
+        item = heap[pos]
+        priority = key[item]
+        while True:
+            child = 2*pos + 1
+            if child >= size:
+                break
+            if child + 1 < size and key[heap[child+1]] < key[heap[child]]:
+                child += 1
+            if priority <= key[heap[child]]:
+                break
+            heap[pos] = heap[child]
+            positions[heap[pos]] = pos
+            pos = child
+        heap[pos] = item
+        positions[item] = pos
+
+class BucketQueue:
+    """A monotone bucket queue (i.e. Dial's algorithm).
+
+    Items are stored in buckets of the given width. If every edge costs
+    at least `width` then everything in the lowest non-empty bucket is
+    already optimal, so the order within a bucket doesn't matter and
+    the search stays exact. Priorities are assumed to be monotone (never
+    lower than that of the last popped item).
+    """
+    def __init__(self, size, width=1):
+        if width <= 0:
+            raise ValueError("Bucket width must be positive.")
+        self.width = width
+
+        # list of buckets (each a list of items), and the current bucket
+        self._buckets = []
+        self._current = 0
+        self._count = 0
+
+        # priority of each item (inf if not queued); stale bucket
+        #  entries are detected by comparing against it
+        self._key = memoryview(np.full(size, np.inf))
+
+        # statistics; number of insertions, decrease-keys and pops
+        self.pushes = 0
+        self.updates = 0
+        self.pops = 0
+
+    def __len__(self):
+        return self._count
+
+    def push(self, item, priority):
+        """Insert the given item, or lower its priority if already queued.
+        """
+        current = self._key[item]
+        if current == np.inf:
+            self._count += 1
+            self.pushes += 1
+        elif priority < current:
+            self.updates += 1
+        else:
+            return
+        self._key[item] = priority
+
+        bucket = int(priority / self.width)
+        buckets = self._buckets
+        while len(buckets) <= bucket:
+            buckets.append([])
+        buckets[bucket].append(item)
+
+    def pop(self):
+        """Remove and return a (priority, item) from the lowest bucket.
+        """
+        buckets, key = self._buckets, self._key
+        while self._count:
+            bucket = buckets[self._current]
+            while bucket:
+                item = bucket.pop()
+                priority = key[item]
+                # skip items that have since been popped (or moved to a lower bucket)
+                if priority == np.inf or int(priority / self.width) != self._current:
+                    continue
+                key[item] = np.inf
+                self._count -= 1
+                self.pops += 1
+                return priority, item
+            self._current += 1
+        raise IndexError("pop from an empty queue")
+
+# available queues, by name
+QUEUES = {
+    "heap": IndexedHeap,
+    "bucket": BucketQueue,
+}
@@ -1,8 +1,12 @@
 """Visualization Tools
 """
 
+import os
+import shutil
+import subprocess
 from .node import Node
 import numpy as np
+from matplotlib import image
 from matplotlib import pyplot as plt
 from matplotlib.animation import FuncAnimation
 
@@ -94,3 +98,104 @@ class ExplorationVisualizer:
             self.stop_running=True
         
         return self.ln,
+
+
+class HeadlessRenderer:
+    """Rasterize the exploration of nodes directly into image frames.
+
+    This bypasses matplotlib's (per frame) artist machinery entirely; many
+    nodes are drawn per frame straight into a numpy image, and frames are
+    written as a PNG sequence or piped into a video via ffmpeg. No display
+    is required.
+    """
+    # RGB colours
+    FREE = (255, 255, 255)
+    OBSTACLE = (0, 0, 0)
+    EXPLORED = (0, 0, 255)
+    PATH = (255, 0, 0)
+
+    # file extensions written as video (everything else is a PNG directory)
+    VIDEO = (".mp4", ".avi", ".mkv", ".mov")
+
+    def __init__(self, map_, nodes, costs, optimal, nodes_per_frame=500, scale=2, buffer_=0):
+        # search variables
+        self.map_ = map_
+        self.costs = costs
+        self.nodes_per_frame = nodes_per_frame
+        self.scale = scale
+
+        # (x,y) grid indices of explored and optimal nodes
+        self.explored = self._indices(nodes)
+        self.optimal = self._indices(optimal)
+
+        # background image (in grid coordinates, i.e. [x,y,rgb])
+        occupancy = map_.occupancy(buffer_)
+        self.background = np.empty(occupancy.shape + (3,), dtype=np.uint8)
+        self.background[occupancy] = self.FREE
+        self.background[~occupancy] = self.OBSTACLE
+
+    def _indices(self, nodes):
+        if len(nodes) == 0:
+            return np.zeros((0,2), dtype=np.int64)
+        pts = np.array([n.vertices for n in nodes]) - self.map_.min_corner
+        return np.round(pts).astype(np.int64)
+
+    def _to_image(self, canvas):
+        # [x,y] grid to a (row, column) image with y pointing up
+        img = np.flipud(canvas.transpose(1,0,2))
+        if self.scale > 1:
+            img = img.repeat(self.scale, axis=0).repeat(self.scale, axis=1)
+        return img
+
+    def frames(self):
+        """Generate the (uint8 RGB) image frames.
+
+        Each frame adds the next `nodes_per_frame` explored nodes; the final
+        frame also draws the optimal path.
+        """
+        canvas = self.background.copy()
+        yield self._to_image(canvas)
+        for i in range(0, len(self.explored), self.nodes_per_frame):
+            batch = self.explored[i:i+self.nodes_per_frame]
+            canvas[batch[:,0],batch[:,1]] = self.EXPLORED
+            yield self._to_image(canvas)
+        canvas[self.optimal[:,0],self.optimal[:,1]] = self.PATH
+        yield self._to_image(canvas)
+
+    def write(self, output, fps=30):
+        """Write the frames to a video (if `output` has a video extension) or
+        a directory of PNG images.
+
+        Returns:
+            The number of frames written.
+        """
+        if os.path.splitext(output)[1].lower() in self.VIDEO:
+            return self._write_video(output, fps)
+
+        os.makedirs(output, exist_ok=True)
+        count = 0
+        for count, frame in enumerate(self.frames(), 1):
+            image.imsave(os.path.join(output, "frame_{:05d}.png".format(count-1)), frame)
+        return count
+
+    def _write_video(self, output, fps):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("Writing video requires ffmpeg; write a PNG sequence instead.")
+
+        count = 0
+        process = None
+        for count, frame in enumerate(self.frames(), 1):
+            if process is None:
+                height, width = frame.shape[:2]
+                process = subprocess.Popen([
+                    ffmpeg, "-y", "-loglevel", "error",
+                    "-f", "rawvideo", "-pix_fmt", "rgb24",
+                    "-s", "{}x{}".format(width, height), "-r", str(fps), "-i", "-",
+                    "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", output
+                ], stdin=subprocess.PIPE)
+            process.stdin.write(frame.tobytes())
+        process.stdin.close()
+        if process.wait() != 0:
+            raise RuntimeError("ffmpeg failed to write '{}'.".format(output))
+        return count
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 """Solve for the optimal path with Dijkstra.
 """
+import os
 import time
 import argparse
 import numpy as np
 from dijkstra.map import FinalMap
 from dijkstra import node, graph, dijkstra, visualize
+from dijkstra.jps import JumpPointSearch
+from dijkstra.cache import SolutionCache
 
 # default inputs
 DEFAULT_START=[5,5]
@@ -17,8 +20,14 @@ def improvisation():
     parser = argparse.ArgumentParser(description="Solve for an optimal path via Dijkstra.") 
     parser.add_argument("-s", "--start", default=DEFAULT_START, nargs='+', type=int, help="Starting node indices.")
     parser.add_argument("-g", "--goal", default=DEFAULT_GOAL, nargs='+', type=int, help="Goal node indices.")
+    parser.add_argument("-l", "--lazy", action="store_true", help="Generate the search graph on the fly (instead of building it up front).")
+    parser.add_argument("-j", "--jps", action="store_true", help="Search via Jump Point Search instead of Dijkstra (implies --lazy).")
+    parser.add_argument("--headless", default=None, type=str, help="Render the exploration to this video file (via ffmpeg) or PNG directory instead of displaying it.")
+    parser.add_argument("--graph", default=None, type=str, help="Directory of a saved (memory mapped) search graph; built and saved there first if needed.")
+    parser.add_argument("--cache", default=None, type=str, help="Directory of cached solutions; reuses the full solution from this start if available.")
     parser.add_argument("-c", "--clearance", default=DEFAULT_CLEARANCE, type=float, help="Obstacle avoidance clearance.")
     parser.add_argument("-r", "--radius", default=DEFAULT_RADIUS, type=float, help="Robot radius.")
+    parser.add_argument("-t", "--transform", action="store_true", help="Inflate obstacles via a (Euclidean) distance transform of the map.")
     return parser.parse_args()
 
 if __name__ == "__main__":
@@ -30,12 +39,15 @@ if __name__ == "__main__":
 
     # dummy map (for testing)
     obstacle_map = FinalMap()
+    if args.transform:
+        obstacle_map.inflation = "transform"
 
-    # start and goal nodes
-    if len(args.start) != 2 or not obstacle_map.is_valid(args.start):
-        raise RuntimeError("Invalid start node: {}".format(args.start))
-    if len(args.goal) != 2 or not obstacle_map.is_valid(args.goal):
-        raise RuntimeError("Invalid goal node: {}".format(args.goal))
+    # start and goal nodes (valid for the robot's radius and clearance)
+    buffer_ = args.clearance + args.radius
+    if len(args.start) != 2 or not obstacle_map.is_valid(args.start, buffer_):
+        raise RuntimeError("Invalid start node (for a radius + clearance of {:g}): {}".format(buffer_, args.start))
+    if len(args.goal) != 2 or not obstacle_map.is_valid(args.goal, buffer_):
+        raise RuntimeError("Invalid goal node (for a radius + clearance of {:g}): {}".format(buffer_, args.goal))
     start_node = node.Node(np.array(args.start))
     goal_node = node.Node(np.array(args.goal))
     print("Start node: {}".format(start_node))
@@ -44,14 +56,30 @@ if __name__ == "__main__":
     # generate graph
     print("Building search graph...")
     st_graph = time.time()
-    graph = graph.Graph(obstacle_map, start_node, buffer_=args.clearance + args.radius)
+    if args.graph and args.jps:
+        raise RuntimeError("Jump Point Search requires a grid; it can't use a saved graph.")
+    if args.graph:
+        if not os.path.isfile(os.path.join(args.graph, "graph.json")):
+            graph.ImplicitGraph(obstacle_map, start_node, buffer_=buffer_).save(args.graph)
+        graph = graph.CSRGraph(args.graph, obstacle_map)
+        if graph.buffer_ != buffer_:
+            raise RuntimeError("Graph in '{}' was built with a different buffer.".format(args.graph))
+    else:
+        graph_type = graph.ImplicitGraph if args.lazy or args.jps else graph.Graph
+        graph = graph_type(obstacle_map, start_node, buffer_=buffer_)
     print("Took {:.3f}s to build search graph.".format(time.time()-st_graph))
     
     # perform search (via Dijkstra's Algorithm)    
     print("Solving for optimal path...")
     st_solve = time.time()
-    d = dijkstra.Dijkstra(graph, start_node)
-    d.solve()
+    if args.jps:
+        d = JumpPointSearch(graph, start_node)
+        d.solve(goal_node)
+    elif args.cache:
+        d = SolutionCache(args.cache).solve(graph, start_node)
+    else:
+        d = dijkstra.Dijkstra(graph, start_node)
+        d.solve(goal_node)
     print("Took {:.3f}s to solve for optimal path.".format(time.time()-st_solve))
 
     # get path to goal node
@@ -59,10 +87,21 @@ if __name__ == "__main__":
     print("Took {:.3f} for all operations.".format(time.time()-st))
 
     # visualize optimal path (and make video of exploration)
-    visualizer = visualize.ExplorationVisualizer(
-            obstacle_map, 
-            *d.get_exploration(True, goal_node),
-            optimal_path
-    ) 
-    visualizer.plot()
+    if args.headless:
+        renderer = visualize.HeadlessRenderer(
+                obstacle_map,
+                *d.get_exploration(True, goal_node),
+                optimal_path,
+                buffer_=buffer_
+        )
+        st_render = time.time()
+        count = renderer.write(args.headless)
+        print("Took {:.3f}s to render {} frames to {}.".format(time.time()-st_render, count, args.headless))
+    else:
+        visualizer = visualize.ExplorationVisualizer(
+                obstacle_map,
+                *d.get_exploration(True, goal_node),
+                optimal_path
+        )
+        visualizer.plot()
 
@@ -41,7 +41,7 @@ if __name__ == "__main__":
     print("Solving for optimal path...")
     st_solve = time.time()
     d = dijkstra.Dijkstra(graph, start_node)
-    d.solve()
+    d.solve(goal_node)
     print("Took {:.3f}s to solve for optimal path.".format(time.time()-st_solve))
 
     # get path to goal node
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import os
 import argparse
 from custom.map import TestMap,FinalMap
 from custom import node, graph, search, visualize
@@ -24,6 +25,7 @@ def parse_args():
     parser.add_argument("-t", "--theta-res", default=DEFAULT_THETA_RES, type=float, help="Theta movement resolution.")
     parser.add_argument("-x", "--x-res", default=DEFAULT_X_RES, type=float, help="X movement resolution.")
     parser.add_argument("-y", "--y-res", default=DEFAULT_Y_RES, type=float, help="Y movemement resolution.")
+    parser.add_argument("--graph", default=None, type=str, help="Directory of a saved (memory mapped) search graph; built and saved there first if needed.")
     return parser.parse_args()
 
 if __name__ == "__main__":
@@ -38,6 +40,7 @@ if __name__ == "__main__":
     resolution = (args.x_res, args.y_res, args.theta_res)
     node.Node.set_actionset(action_set)
     node.Node.set_resolution(resolution)
+    obstacle_map.set_resolution(resolution)
 
     # create start and goal nodes
     if len(args.start) != 3 or not obstacle_map.is_valid(args.start):
@@ -52,7 +55,14 @@ if __name__ == "__main__":
 
     # generate graph
     print("Generating graph...")
-    graph = graph.Graph(obstacle_map, start_node, buffer_=args.radius + args.clearance)
+    if args.graph:
+        if not os.path.isfile(os.path.join(args.graph, "graph.json")):
+            graph.Graph(obstacle_map, start_node, buffer_=args.radius + args.clearance).save(args.graph)
+        graph = graph.CSRGraph(args.graph, obstacle_map, args.radius + args.clearance)
+        if graph.params["start"] != start_node.index:
+            raise RuntimeError("Graph in '{}' was built from a different start node.".format(args.graph))
+    else:
+        graph = graph.Graph(obstacle_map, start_node, buffer_=args.radius + args.clearance)
 
     # perform search    
     print("Performing A* search...")
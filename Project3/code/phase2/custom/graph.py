@@ -1,8 +1,12 @@
 """Class representing the Graph of Nodes (derived via BFS)
 """
-import time
+import os
 import sys
+import json
+import time
 from collections import defaultdict
+from collections.abc import Mapping
+import numpy as np
 from .node import Node
 
 class Graph:
@@ -18,13 +22,14 @@ class Graph:
         # sanity check input
         if not isinstance(start_node, Node):
             raise ValueError("Start node given to Graph isn't a Node object.")
+        self.start_node = start_node
 
         # calculate total possible number of nodes (for reference)
         self.max_nodes = map_.xbounds[-1]/start_node.resolution_[0]\
                          * map_.ybounds[-1]/start_node.resolution_[1]\
                          * 360/start_node.resolution_[2]
 
-        # nodes: dict of explored nodes (key: value) -> (hash: node)
+        # nodes: dict of explored nodes (key: value) -> (lattice index: node)
         # tree: hierarchical relationships between nodes (parent: children)
         st = time.time()
         self.nodes, self.tree = self.construct(start_node)
@@ -40,7 +45,7 @@ class Graph:
         while len(current_nodes) != 0:
             new_nodes = []
             for node in current_nodes:
-                node_hash = hash(node)
+                node_hash = node.index
 
                 # we've already explored this node
                 if node_hash in nodes.keys():
@@ -52,7 +57,7 @@ class Graph:
                 
                 # add valid nodes to our tree
                 if node.parent:
-                    tree[hash(node.parent)][node_hash] = node.cost2come - node.parent.cost2come
+                    tree[node.parent.index][node_hash] = node.cost2come - node.parent.cost2come
                
                 # valid node; add it to our visited nodes
                 nodes[node_hash] = node
@@ -70,15 +75,138 @@ class Graph:
         print()
         return nodes, tree
 
+    def save(self, directory):
+        """Save the graph (in CSR form) to the given directory.
+
+        Nodes are numbered in order of their lattice index (see
+        `Node.lattice_index`). The directory holds:
+            lattice.npy:   (V,) lattice index of each node.
+            vertices.npy:  (V,3) (x,y,theta) position of each node.
+            cost2come.npy: (V,) cost2come of each node.
+            indptr.npy:    (V+1,) offsets of each node's edges.
+            children.npy:  (E,) lattice index of each edge's child.
+            costs.npy:     (E,) cost of each edge.
+            occupancy.npy: valid lattice points at our buffer (see `Map.occupancy`;
+                           `Map.is_valid` agrees with it), if the map has a resolution.
+            graph.json:    build parameters.
+        """
+        os.makedirs(directory, exist_ok=True)
+        lattice = np.fromiter(self.nodes.keys(), dtype=np.int64, count=len(self.nodes))
+        lattice.sort()
+        nodes = [self.nodes[i] for i in lattice.tolist()]
+        np.save(os.path.join(directory, "lattice.npy"), lattice)
+        np.save(os.path.join(directory, "vertices.npy"), np.array([n.vertices for n in nodes], dtype=float).reshape(-1,3))
+        np.save(os.path.join(directory, "cost2come.npy"), np.array([n.cost2come for n in nodes], dtype=float))
+        if self.map_.resolution is not None:
+            np.save(os.path.join(directory, "occupancy.npy"), self.map_.occupancy(self.buffer_))
+
+        # edges; (don't use self.tree[i], which would add empty entries)
+        edges = [self.tree.get(i, {}) for i in lattice.tolist()]
+        indptr = np.zeros(len(lattice)+1, dtype=np.int64)
+        np.cumsum([len(e) for e in edges], out=indptr[1:])
+        num_edges = int(indptr[-1])
+        np.save(os.path.join(directory, "indptr.npy"), indptr)
+        np.save(os.path.join(directory, "children.npy"), np.fromiter((c for e in edges for c in e.keys()), dtype=np.int64, count=num_edges))
+        np.save(os.path.join(directory, "costs.npy"), np.fromiter((c for e in edges for c in e.values()), dtype=float, count=num_edges))
+
+        params = {
+            "map": type(self.map_).__name__,
+            "signature": self.map_.signature(),
+            "buffer": self.buffer_,
+            "start": self.start_node.index,
+            "resolution": [float(r) for r in Node.resolution_],
+            "index_bits": Node.index_bits_,
+            "step_size": Node.action_set_.step_size,
+            "angles": list(Node.action_set_.angles),
+            "nodes": len(lattice),
+            "edges": num_edges,
+        }
+        with open(os.path.join(directory, "graph.json"), "w") as jsonfile:
+            json.dump(params, jsonfile, indent=2)
+
+class CSRGraph(Graph):
+    """A (read-only) Graph saved via `Graph.save`, memory mapped from disk.
+
+    Nothing is loaded up front; `nodes` and `tree` are views over the
+    memory mapped files (keyed by lattice index, as in `Graph`), so even
+    graphs larger than memory can be searched.
+    """
+    def __init__(self, directory, map_=None, buffer_=None):
+        """
+        Args:
+            directory: Directory the graph was saved to.
+            map_: (Optional) map to check the graph against; must match the
+                map (its obstacles and resolution) the graph was built from.
+            buffer_: (Optional) buffer the graph must have been built with.
+        """
+        self.directory = directory
+        with open(os.path.join(directory, "graph.json")) as jsonfile:
+            self.params = json.load(jsonfile)
+        if map_ is not None and map_.signature() != self.params["signature"]:
+            raise RuntimeError("Graph in '{}' was built for a different map.".format(directory))
+        if buffer_ is not None and buffer_ != self.params["buffer"]:
+            raise RuntimeError("Graph in '{}' was built with a different buffer.".format(directory))
+        if [float(r) for r in Node.resolution_] != self.params["resolution"] or Node.index_bits_ != self.params["index_bits"]:
+            raise RuntimeError("Graph in '{}' was built with a different node resolution.".format(directory))
+        if Node.action_set_.step_size != self.params["step_size"] or list(Node.action_set_.angles) != self.params["angles"]:
+            raise RuntimeError("Graph in '{}' was built with a different action set.".format(directory))
+        self.map_ = map_
+        self.buffer_ = self.params["buffer"]
 
+        def load(name):
+            return np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+        self.lattice = load("lattice")
+        self.vertices = load("vertices")
+        self.cost2come = load("cost2come")
+        self.indptr = load("indptr")
+        self.children = load("children")
+        self.costs = load("costs")
 
+        self.nodes = _NodeView(self)
+        self.tree = _TreeView(self)
 
+    def __getstate__(self):
+        # reopen (i.e. share) the memory mapped files rather than copying them
+        return {"directory": self.directory, "map_": self.map_, "buffer_": self.buffer_}
 
+    def __setstate__(self, state):
+        self.__init__(state["directory"], state["map_"], state["buffer_"])
 
+    def find(self, index):
+        """Return the node id of the given lattice index (or None).
+        """
+        i = int(np.searchsorted(self.lattice, index))
+        if i < len(self.lattice) and self.lattice[i] == index:
+            return i
+        return None
 
+class _NodeView(Mapping):
+    """Mapping (lattice index: node) over the nodes of a CSRGraph.
+    """
+    def __init__(self, graph):
+        self.graph = graph
 
+    def __len__(self):
+        return len(self.graph.lattice)
 
+    def __iter__(self):
+        return iter(self.graph.lattice.tolist())
 
+    def __contains__(self, index):
+        return self.graph.find(index) is not None
 
+    def __getitem__(self, index):
+        i = self.graph.find(index)
+        if i is None:
+            raise KeyError(index)
+        return Node(np.array(self.graph.vertices[i]), float(self.graph.cost2come[i]), index=index)
 
-
+class _TreeView(_NodeView):
+    """Mapping (lattice index: {child lattice index: cost}) over the edges of a CSRGraph.
+    """
+    def __getitem__(self, index):
+        i = self.graph.find(index)
+        if i is None:
+            raise KeyError(index)
+        start, stop = self.graph.indptr[i], self.graph.indptr[i+1]
+        return dict(zip(self.graph.children[start:stop].tolist(), self.graph.costs[start:stop].tolist()))
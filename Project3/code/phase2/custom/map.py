@@ -1,6 +1,7 @@
 """Obstacle map
 """
 
+import hashlib
 from abc import ABC, abstractmethod
 import numpy as np
 import matplotlib.path as mplPath
@@ -23,13 +24,109 @@ class Map(ABC):
             min_corner
         ]))
 
+        # (x,y) resolution of the occupancy grid; None to check points exactly
+        self.resolution = None
+
+        # cache of occupancy grids (key: value) -> ((resolution, buffer): grid)
+        self._occupancy = {}
+
+        # cache of lookup grids (key: value) -> ((resolution, buffer): grid)
+        self._lookup = {}
+
     def is_in_workspace(self, pt, buffer_=0):
         """Returns True if the given point is within our workspace."""
         return self.workspace.contains_point(pt, radius=-(buffer_+1))
 
+    def set_resolution(self, resolution):
+        """Set the (x,y) resolution used to check points, i.e. that of `Node`.
+
+        Points are then rounded to that resolution and looked up in a
+        precomputed grid (see `lookup`) first.
+        """
+        if len(resolution) < 2:
+            raise RuntimeError("Expected resolution to have at least length 2 (x, y).")
+        self.resolution = (resolution[0], resolution[1])
+
+        # change in buffer covering the rounding; points are up to half a cell diagonal
+        #  from their lattice point, but polygons (and the workspace) only grow by
+        #  half of any buffer (see `matplotlib.path.Path.contains_point`)
+        self._margin = float(np.hypot(*self.resolution))
+
+        # lattice indices of the first grid point (see `lattice`)
+        xs, ys = self.lattice()
+        self._origin = (int(xs[0]), int(ys[0]))
+
+    def signature(self):
+        """Returns a hash of our workspace bounds, resolution and obstacle definitions.
+        """
+        sha = hashlib.sha1()
+        sha.update(repr((type(self).__name__, self.min_corner.tolist(), self.max_corner.tolist(), self.resolution)).encode())
+        for obstacle in self.obstacles:
+            sha.update(obstacle.definition().encode())
+        return sha.hexdigest()
+
+    def lattice(self):
+        """Returns the (x,y) lattice indices spanned by our workspace at our resolution.
+        """
+        x_res, y_res = self.resolution
+        xs = np.arange(np.ceil(self.min_corner[0]/x_res), np.floor(self.max_corner[0]/x_res)+1, dtype=np.int64)
+        ys = np.arange(np.ceil(self.min_corner[1]/y_res), np.floor(self.max_corner[1]/y_res)+1, dtype=np.int64)
+        return xs, ys
+
+    def occupancy(self, buffer_=0):
+        """Returns a boolean grid of the valid lattice points in our workspace.
+
+        The grid is indexed by [round(x/x_res) - xs[0], round(y/y_res) - ys[0]]
+        (see `lattice`), and is computed (in vectorized form) once per
+        resolution and buffer size.
+        """
+        if self.resolution is None:
+            raise RuntimeError("Cannot compute an occupancy grid; call `set_resolution` first.")
+        key = (self.resolution, buffer_)
+        if key not in self._occupancy:
+            xs, ys = self.lattice()
+            X,Y = np.meshgrid(xs*self.resolution[0], ys*self.resolution[1], indexing="ij")
+            pts = np.column_stack([X.ravel(), Y.ravel()])
+
+            valid = self.workspace.contains_points(pts, radius=-(buffer_+1))
+            for obstacle in self.obstacles:
+                valid &= ~obstacle.within_points(pts, buffer_)
+            self._occupancy[key] = valid.reshape(X.shape)
+        return self._occupancy[key]
+
+    def lookup(self, buffer_=0):
+        """Returns a grid classifying the points rounded to each lattice point.
+
+        The grid is indexed like `occupancy`, and holds 1 where every point
+        rounded to that lattice point is valid, 0 where every such point is
+        invalid, and -1 where it depends on the point (i.e. near obstacle or
+        workspace boundaries).
+        """
+        key = (self.resolution, buffer_)
+        if key not in self._lookup:
+            grid = np.full(self.occupancy(buffer_).shape, -1, dtype=np.int8)
+            grid[self.occupancy(buffer_ + self._margin)] = 1
+            if buffer_ - self._margin > -1:
+                grid[~self.occupancy(buffer_ - self._margin)] = 0
+            self._lookup[key] = grid
+        return self._lookup[key]
+
     def is_valid(self, pt, buffer_=0):
-        """Returns True if the given point is within our workspace and not an obstacle."""
+        """Returns True if the given point is within our workspace and not an obstacle.
+
+        If a resolution is set the point is rounded to it and looked up in
+        our (cached) lookup grid; only points near a boundary are checked
+        against the obstacles themselves.
+        """
         xy = pt[:2]
+        if self.resolution is not None:
+            grid = self.lookup(buffer_)
+            ix = round(xy[0]/self.resolution[0]) - self._origin[0]
+            iy = round(xy[1]/self.resolution[1]) - self._origin[1]
+            if 0 <= ix < grid.shape[0] and 0 <= iy < grid.shape[1]:
+                state = grid.item(ix, iy)
+                if state != -1:
+                    return state == 1
         return self.is_in_workspace(xy, buffer_) and not self.is_obstacle(xy, buffer_)
 
     def is_obstacle(self, pt, buffer_=0):
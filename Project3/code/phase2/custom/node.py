@@ -46,10 +46,15 @@ class Node:
     # default action set
     action_set_ = ActionSet()
 
-    def __init__(self, vertices, cost2come=0, parent=None):
+    # number of bits used by each of the (offset) x and y bins of our lattice index
+    index_bits_ = 24
+
+    def __init__(self, vertices, cost2come=0, parent=None, index=None):
         # vertices (x,y,theta) position of node
-        self.vertices = np.array(vertices)
-        self.rounded_vertices = self.round(vertices)
+        self.vertices = vertices if isinstance(vertices, np.ndarray) else np.array(vertices, dtype=float)
+
+        # index; unique integer of the lattice (x,y,theta) bin of this node
+        self.index = self.lattice_index(self.vertices) if index is None else index
 
         # cost2come; cumulative cost of getting to this node
         self.cost2come = cost2come
@@ -57,12 +62,18 @@ class Node:
         # reference to the parent node
         self.parent = parent
 
+    @property
+    def rounded_vertices(self):
+        """Our vertices, rounded to the class's resolution.
+        """
+        return self.round(self.vertices)
+
     def __hash__(self):
         """Calculate the unique hash of our vertices (for easier comparison)
 
-        Note that this uses our rounded vertices, to allow binning.
+        Note that this uses our lattice index, to allow binning.
         """
-        return hash(tuple(self.rounded_vertices))
+        return self.index
 
     def __str__(self):
         """String representation (for debugging / convenience)
@@ -74,7 +85,7 @@ class Node:
         """
         if not isinstance(rhs, Node):
             raise RuntimeError("Cannot compare nodes to non-nodes")
-        return self.rounded_vertices == rhs.rounded_vertices
+        return self.index == rhs.index
 
     @classmethod
     def set_actionset(cls, actionset):
@@ -92,13 +103,27 @@ class Node:
             raise RuntimeError("Expected resolution to have length 3 (x, y, theta).")
         cls.resolution_ = resolution
 
+    @classmethod
+    def lattice_index(cls, vertices):
+        """Calculate the lattice index of the given (x,y,theta) vertices.
+
+        Each coordinate is binned to the class's resolution (theta wraps
+        around) and the bins are packed into a single integer. Also accepts
+        an (N,3) array, returning an (N,) array of indices.
+        """
+        bins = np.rint(np.asarray(vertices, dtype=float) / cls.resolution_).astype(np.int64)
+        num_theta = int(round(360 / cls.resolution_[2]))
+        offset = 1 << (cls.index_bits_ - 1)
+
+        x = bins[...,0] + offset
+        y = bins[...,1] + offset
+        index = ((x << cls.index_bits_) | y) * num_theta + bins[...,2] % num_theta
+        return int(index) if index.ndim == 0 else index
+
     def round(self, vertices):
         """Round the given vertices (x,y,theta) to the class's resolution.
         """
-        result = [] 
-        for val, res in zip(vertices, self.resolution_):
-            result.append(round(val/res)*res)
-        return result
+        return (np.rint(np.asarray(vertices, dtype=float) / self.resolution_) * self.resolution_).tolist()
 
     def cost2go(self, goal_node):
         """Calculate the euclidean distance to the target node.
@@ -111,28 +136,14 @@ class Node:
         This list is "dumb" in that it ignores workspace bounds
         and obstacles.
         """
-        children = []
         actions = self.action_set_.get_actions(self.vertices)
 
-        for action, cost in actions.items(): 
-            # calculate child position and cost and store in a new node
-            new_vertices = self.vertices + np.array(action)
-            new_vertices[2] %= 360
-            child = Node(new_vertices, self.cost2come + cost, self)
-
-            # small optimization; don't return parent node
-            if (not self.parent) or child != self.parent:
-                children.append(child)
-        return children
-
-
-
-
-
-
-
-
-
-
-
+        # calculate all child positions (and lattice indices) at once
+        new_vertices = self.vertices + np.array(list(actions.keys()))
+        new_vertices[:,2] %= 360
+        indices = self.lattice_index(new_vertices).tolist()
 
+        # small optimization; don't return parent node
+        parent = self.parent.index if self.parent else None
+        return [Node(vertices, self.cost2come + cost, self, index)
+                for vertices, cost, index in zip(new_vertices, actions.values(), indices) if index != parent]
@@ -19,12 +19,22 @@ class Obstacle(ABC):
     def within(self,pt,buffer_):
         """Return True if the given point is within the Obstacle."""
         ...
+
+    @abstractmethod
+    def within_points(self,pts,buffer_):
+        """Vectorized `within`; returns a boolean array for an (N,2) array of points."""
+        ...
     
     @abstractmethod
     def plot(self):
         """Plot self."""
         ...
 
+    @abstractmethod
+    def definition(self):
+        """Return a string uniquely describing this obstacle (for caching)."""
+        ...
+
 class Polygon(Obstacle):
     def __init__(self, pts):
         super().__init__()
@@ -33,6 +43,12 @@ class Polygon(Obstacle):
     def within(self, pt, buffer_=0):
         return self.pts.contains_point(pt, radius=-(buffer_+1))
 
+    def within_points(self, pts, buffer_=0):
+        return self.pts.contains_points(pts, radius=-(buffer_+1))
+
+    def definition(self):
+        return "Polygon({})".format(self.pts.vertices.tolist())
+
     def plot(self, ax):
         e = patches.Polygon(xy=self.pts.vertices)
         ax.add_artist(e)
@@ -51,6 +67,13 @@ class Ellipse(Obstacle):
         val = ((pt[0]-self.center[0])/(self.major/2+buffer_))**2.0 + ((pt[1]-self.center[1])/(self.minor/2+buffer_))**2.0
         return val <= 1
 
+    def within_points(self, pts, buffer_=0):
+        pts = np.asarray(pts)
+        return self.within(pts.T, buffer_)
+
+    def definition(self):
+        return "Ellipse({}, {}, {})".format(list(self.center), self.major, self.minor)
+
     def plot(self, ax):
         e = patches.Ellipse(xy=self.center,width=self.major,height=self.minor)
         ax.add_artist(e)
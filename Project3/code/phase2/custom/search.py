@@ -20,7 +20,7 @@ class AStar:
             raise TypeError("src input must be of class node.Node")
         self.graph = graph
         self.src = src
-        self.src_hash = hash(src)
+        self.src_hash = src.index
 
         # initialize solution lists
         self._dist = None
@@ -89,11 +89,11 @@ class AStar:
         """Get the optimal path and cost to the given destination node.
         """
         # sanity checks
-        current_hash = hash(dst)
         if self._dist is None:
             raise RuntimeError("Cannot return optimal path; call `solve` first.")
         if not isinstance(dst, Node):
             raise TypeError("dst input must be of class node.Node")
+        current_hash = dst.index
         if current_hash not in self.graph.nodes.keys():
             raise RuntimeError("Given destination node not found in graph.")
 